@@ -0,0 +1,390 @@
+"""Micro-benchmarks for the scraper's hot paths.
+
+Usage:
+    python bench.py extract PAGES_DIR [--repeat N]
+    python bench.py html PAGES_DIR [--repeat N]
+    python bench.py parse PAGES_DIR [--repeat N] [--workers 1,2,4,8]
+    python bench.py counts [--n 1000000]
+    python bench.py e2e [--pages PAGES_DIR] [--engines serial,concurrent,pipeline]
+                        [--latency S] [--error-rate P] [--rate-429 P] [--queries N]
+
+e2e runs discovery, enrichment and export end to end against the local
+fake server in fake_youtube.py, so it never touches youtube.com or
+googleapis.com. Its engines are:
+
+    serial      collect_all_channels + process_channels with one worker and
+                no Data API batch wait: the current fetch path, one request
+                at a time (not the original sleep-paced script)
+    concurrent  the same with SCRAPER_WORKERS (--workers) threads
+    pipeline    run_pipeline, the streaming staged engine
+
+Host rate limits are lifted for every engine, so the numbers show the
+engines themselves rather than the configured politeness delays.
+
+PAGES_DIR holds saved YouTube pages (*.html), e.g. search results and
+channel /about pages captured with a browser or curl.
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import fake_youtube
+import main
+
+
+def legacy_extract_ytinitialdata(html: str) -> Optional[Dict[str, Any]]:
+    """The original multi-regex extractor, kept as the comparison baseline."""
+    patterns = [
+        r'ytInitialData"\s*:\s*({.*?})\s*;',
+        r"var ytInitialData\s*=\s*({.*?});",
+        r"ytInitialData\s*=\s*({.*?});",
+        r'window\["ytInitialData"\]\s*=\s*({.*?});',
+    ]
+    for pat in patterns:
+        m = re.search(pat, html, re.S)
+        if not m:
+            continue
+        try:
+            return json.loads(m.group(1))
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def legacy_parse_view_count(view_text: str) -> Optional[int]:
+    """The original per-cell count parser, kept as the comparison baseline."""
+    if not view_text:
+        return None
+    text = view_text.replace("\xa0", " ").lower().strip()
+    for word in ["просмотров", "просмотра", "просмотры", "просмотр", "views", "view", "қаралым"]:
+        text = text.replace(word, "")
+    m = re.search(r"([\d\s.,]+)", text)
+    if not m:
+        return None
+    num_str = m.group(1).replace(" ", "").replace(",", ".")
+    multiplier = 1
+    if re.search(r"(млн|million|mln|\bm\b|\bм\b)", text):
+        multiplier = 1_000_000
+    elif re.search(r"(тыс|тысяч|\bk\b|\bк\b|мың)", text):
+        multiplier = 1_000
+    try:
+        value = float(num_str) if "." in num_str else int(num_str)
+        return int(value * multiplier)
+    except ValueError:
+        return None
+
+
+# Raw count strings and the integer each should normalize to.
+COUNT_CASES: List[Any] = [
+    ("1,2 млн подписчиков", 1_200_000),
+    ("350 тыс.", 350_000),
+    ("12K", 12_000),
+    ("мың", None),
+    ("12.5 тыс.", 12_500),
+    ("15 тыс. подписчиков", 15_000),
+    ("10 тысяч подписчиков", 10_000),
+    ("1 234 567 просмотров", 1_234_567),
+    ("1\xa0234 просмотра", 1_234),
+    ("1,234 subscribers", 1_234),
+    ("2.3M subscribers", 2_300_000),
+    ("1.5 million", 1_500_000),
+    ("1.2 mln views", 1_200_000),
+    ("3 bln", 3_000_000_000),
+    ("12\u2009345 views", 12_345),
+    ("2.1B views", 2_100_000_000),
+    ("3,4 млрд", 3_400_000_000),
+    ("1,5 млн жазылушы", 1_500_000),
+    ("45 мың жазылушы", 45_000),
+    ("5 к", 5_000),
+    ("987 views", 987),
+    ("No views", None),
+    ("Нет просмотров", None),
+    ("", None),
+]
+
+
+def synthetic_counts(n: int) -> List[str]:
+    """n random count strings in the shapes YouTube shows in ru/kk/en locales."""
+    rng = random.Random(0)
+    shapes = [
+        lambda: f"{rng.randint(1, 999)},{rng.randint(0, 9)} млн подписчиков",
+        lambda: f"{rng.randint(1, 999)} тыс. просмотров",
+        lambda: f"{rng.randint(1, 999)}K views",
+        lambda: f"{rng.randint(1, 99)}.{rng.randint(0, 9)}M subscribers",
+        lambda: f"{rng.randint(1, 999)} мың жазылушы",
+        lambda: f"{rng.randint(1, 999)}\xa0{rng.randint(100, 999)} просмотров",
+        lambda: f"{rng.randint(1, 999)} views",
+        lambda: "Нет просмотров",
+    ]
+    return [rng.choice(shapes)() for _ in range(n)]
+
+
+def load_pages(pages_dir: str) -> List[str]:
+    """Read every saved *.html page in a directory."""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(pages_dir, "*.html"))):
+        with open(path, encoding="utf-8") as fh:
+            pages.append(fh.read())
+    if not pages:
+        raise SystemExit(f"No *.html pages found in {pages_dir}")
+    return pages
+
+
+def time_per_page(func: Callable[[str], Any], pages: List[str], repeat: int) -> float:
+    """Return mean seconds per page for func over all pages."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            func(html)
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+
+def bench_extract(args: argparse.Namespace) -> None:
+    pages = load_pages(args.pages_dir)
+    mb = sum(len(p) for p in pages) / len(pages) / 1_000_000
+    print(f"{len(pages)} pages, {mb:.2f} MB average")
+
+    agree = sum(
+        1 for html in pages if legacy_extract_ytinitialdata(html) == main.extract_ytinitialdata(html)
+    )
+    print(f"legacy and single-scan results agree on {agree}/{len(pages)} pages")
+
+    legacy = time_per_page(legacy_extract_ytinitialdata, pages, args.repeat)
+    single = time_per_page(main.extract_ytinitialdata, pages, args.repeat)
+    both = time_per_page(lambda h: main.extract_initial_payloads(h, include_player=True), pages, args.repeat)
+    print(f"legacy regex extractor:      {legacy * 1000:8.2f} ms/page")
+    print(f"single-scan extractor:       {single * 1000:8.2f} ms/page ({legacy / single:.1f}x)")
+    print(f"single-scan + player resp.:  {both * 1000:8.2f} ms/page")
+
+
+def bench_html(args: argparse.Namespace) -> None:
+    pages = load_pages(args.pages_dir)
+    url = "https://www.youtube.com/@bench"
+
+    mismatches = 0
+    for i, html in enumerate(pages):
+        lite = main.parse_about_html(url, html, backend="lite")
+        full = main.parse_about_html(url, html, backend="bs4")
+        if lite != full:
+            mismatches += 1
+            diff = {k: (lite[k], full[k]) for k in lite if lite[k] != full.get(k)}
+            print(f"[MISMATCH] page {i}: {diff}")
+    print(f"lite and bs4 rows identical on {len(pages) - mismatches}/{len(pages)} pages")
+
+    for backend in ("bs4", "lite"):
+        cpu_start = time.process_time()
+        for _ in range(args.repeat):
+            for html in pages:
+                main.parse_about_html(url, html, backend=backend)
+        cpu = (time.process_time() - cpu_start) / (args.repeat * len(pages))
+
+        tracemalloc.start()
+        for html in pages:
+            main.extract_html_fields(html, backend=backend)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{backend:>5}: {cpu * 1000:8.2f} ms CPU/page, {peak / 1_000_000:8.2f} MB peak extraction memory")
+
+
+def bench_parse(args: argparse.Namespace) -> None:
+    pages = load_pages(args.pages_dir) * args.repeat
+    url = "https://www.youtube.com/@bench"
+    print(f"{len(pages)} About-page parses per run, {os.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    for html in pages:
+        main.parse_about_html(url, html)
+    inline = len(pages) / (time.perf_counter() - start)
+    print(f"in-thread:   {inline:8.1f} pages/s")
+
+    for workers in [int(w) for w in args.workers.split(",")]:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(main.parse_about_html, [url] * workers, pages[:workers]))  # warm up workers
+            start = time.perf_counter()
+            list(pool.map(main.parse_about_html, [url] * len(pages), pages, chunksize=4))
+            rate = len(pages) / (time.perf_counter() - start)
+        print(f"{workers:>2} process{'es' if workers > 1 else '  '}: {rate:8.1f} pages/s ({rate / inline:.2f}x)")
+
+
+def bench_counts(args: argparse.Namespace) -> None:
+    raw = [case for case, _ in COUNT_CASES]
+    vectorized = main.normalize_counts(raw).astype("object").where(lambda c: c.notna(), None).tolist()
+    print(f"{'input':<26} {'expected':>13} {'scalar':>13} {'vectorized':>13} {'legacy':>13}")
+    wrong = 0
+    for (text, expected), vec in zip(COUNT_CASES, vectorized):
+        scalar, legacy = main.count_from_text(text), legacy_parse_view_count(text)
+        ok = scalar == expected and vec == expected
+        wrong += not ok
+        print(f"{text!r:<26} {expected!s:>13} {scalar!s:>13} {vec!s:>13} {legacy!s:>13} {'ok' if ok else 'MISMATCH'}")
+    print(f"{len(COUNT_CASES) - wrong}/{len(COUNT_CASES)} cases correct\n")
+
+    values = synthetic_counts(args.n)
+    timings = {}
+    start = time.perf_counter()
+    legacy_out = [legacy_parse_view_count(v) for v in values]
+    timings["legacy per-cell"] = time.perf_counter() - start
+    start = time.perf_counter()
+    scalar_out = [main.count_from_text(v) for v in values]
+    timings["compiled per-cell"] = time.perf_counter() - start
+    start = time.perf_counter()
+    series = main.normalize_counts(values)
+    timings["vectorized pandas"] = time.perf_counter() - start
+
+    vector_out = series.astype("object").where(series.notna(), None).tolist()
+    agree = sum(1 for a, b in zip(scalar_out, vector_out) if a == b)
+    legacy_agree = sum(1 for a, b in zip(scalar_out, legacy_out) if a == b)
+    print(f"{args.n:,} synthetic strings; vectorized agrees with per-cell on {agree:,}, legacy on {legacy_agree:,}")
+    base = timings["legacy per-cell"]
+    for name, seconds in timings.items():
+        print(f"{name:>18}: {seconds:7.2f} s  {args.n / seconds / 1e6:6.2f} M strings/s  ({base / seconds:.1f}x)")
+
+
+def _run_engine(engine: str, workdir: str, queries: int, results: Any) -> None:
+    """Spawned child: one engine end to end against the fake server, reporting its own CPU and RSS."""
+    os.chdir(workdir)
+    sys.stdout = open(os.devnull, "w")
+    main.SEARCH_QUERIES = main.SEARCH_QUERIES[:queries]
+    main.metrics().reset()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    if engine == "pipeline":
+        with main.StreamingExporter() as exporter:
+            main.run_pipeline(sink=exporter.write)
+        rows = exporter.count
+    else:
+        channels = main.collect_all_channels()
+        collected = main.process_channels(channels)
+        main.export_results(collected)
+        rows = len(collected)
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    registry = main.metrics()
+    results.put(
+        {
+            "engine": engine,
+            "rows": rows,
+            "wall": wall,
+            "cpu": cpu,
+            "requests": registry.counter_total("http_requests_total"),
+            "failures": registry.counter_total("http_failures_total"),
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+    )
+
+
+def bench_e2e(args: argparse.Namespace) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    config = fake_youtube.FakeConfig(
+        latency=args.latency,
+        jitter=args.latency / 2,
+        error_rate=args.error_rate,
+        rate_429=args.rate_429,
+        interstitial_rate=args.interstitial_rate,
+        quota_after=args.quota_after,
+        channels=args.channels,
+        search_pages=fake_youtube.load_recorded(args.pages, "search*.html"),
+        about_pages=fake_youtube.load_recorded(args.pages, "about*.html"),
+    )
+    ready = ctx.Queue()
+    server = ctx.Process(target=fake_youtube.serve, args=("127.0.0.1", 0, config, ready), daemon=True)
+    server.start()
+    origin = f"http://127.0.0.1:{ready.get(timeout=30)}"
+    print(
+        f"fake server {origin}: latency {args.latency * 1000:.0f} ms, "
+        f"{args.error_rate:.0%} errors, {args.rate_429:.0%} 429s, "
+        f"{args.interstitial_rate:.0%} interstitials; {args.queries} queries"
+    )
+
+    # Spawned children import main afresh, so these take effect there and not here.
+    os.environ.update(
+        {
+            "YOUTUBE_ORIGIN": origin,
+            "YOUTUBE_API_BASE": f"{origin}/youtube/v3",
+            "YOUTUBE_API_KEY": "bench",
+            "SCRAPER_HOST_RATE": "1000000",
+            "SCRAPER_API_RATE": "1000000",
+            "SCRAPER_HOST_BURST": "1000",
+            "SCRAPER_HTTP_CACHE": "",
+            "SCRAPER_JOURNAL": "",
+            "SCRAPER_STORE": "",
+            "SCRAPER_ID_CACHE": "",
+            "SCRAPER_METRICS": "",
+            "SCRAPER_PARSE_WORKERS": "0",
+            "SCRAPER_SEARCH_PAGES": "1",
+        }
+    )
+    print(f"{'engine':>10} {'rows':>6} {'wall s':>8} {'ch/s':>8} {'CPU ms/page':>12} {'requests':>9} {'failed':>7} {'peak RSS MB':>12}")
+    try:
+        for engine in args.engines.split(","):
+            os.environ["SCRAPER_WORKERS"] = "1" if engine == "serial" else str(args.workers)
+            # A lone worker has no one to share a batch with, so it shouldn't wait for one.
+            os.environ["YOUTUBE_API_BATCH_WAIT"] = "0" if engine == "serial" else str(main.YT_API_BATCH_WAIT)
+            results = ctx.Queue()
+            with tempfile.TemporaryDirectory() as workdir:
+                child = ctx.Process(target=_run_engine, args=(engine, workdir, args.queries, results))
+                child.start()
+                r = results.get()
+                child.join()
+            pages = max(1.0, r["requests"])
+            print(
+                f"{engine:>10} {r['rows']:>6} {r['wall']:>8.2f} {r['rows'] / r['wall']:>8.1f} "
+                f"{r['cpu'] / pages * 1000:>12.2f} {int(r['requests']):>9} {int(r['failures']):>7} "
+                f"{r['peak_rss_mb']:>12.1f}"
+            )
+    finally:
+        server.terminate()
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_extract = sub.add_parser("extract", help="ytInitialData extraction speed")
+    p_extract.add_argument("pages_dir")
+    p_extract.add_argument("--repeat", type=int, default=5)
+    p_extract.set_defaults(func=bench_extract)
+
+    p_html = sub.add_parser("html", help="About-page HTML backends: equivalence, CPU and memory")
+    p_html.add_argument("pages_dir")
+    p_html.add_argument("--repeat", type=int, default=3)
+    p_html.set_defaults(func=bench_html)
+
+    p_parse = sub.add_parser("parse", help="About-page parse throughput vs. process-pool size")
+    p_parse.add_argument("pages_dir")
+    p_parse.add_argument("--repeat", type=int, default=10)
+    p_parse.add_argument("--workers", default="1,2,4,8", help="comma-separated pool sizes to try")
+    p_parse.set_defaults(func=bench_parse)
+
+    p_counts = sub.add_parser("counts", help="count-text normalization: correctness table and speed")
+    p_counts.add_argument("--n", type=int, default=1_000_000, help="synthetic strings to normalize")
+    p_counts.set_defaults(func=bench_counts)
+
+    p_e2e = sub.add_parser("e2e", help="end-to-end throughput against the local fake YouTube server")
+    p_e2e.add_argument("--pages", help="saved search*.html / about*.html pages to serve (synthetic otherwise)")
+    p_e2e.add_argument("--engines", default="serial,concurrent,pipeline")
+    p_e2e.add_argument("--workers", type=int, default=main.MAX_WORKERS, help="SCRAPER_WORKERS for 'concurrent'")
+    p_e2e.add_argument("--queries", type=int, default=10, help="how many of SEARCH_QUERIES to run")
+    p_e2e.add_argument("--channels", type=int, default=500, help="distinct channels behind the fake search")
+    p_e2e.add_argument("--latency", type=float, default=0.05, help="mean server latency in seconds")
+    p_e2e.add_argument("--error-rate", type=float, default=0.0)
+    p_e2e.add_argument("--rate-429", type=float, default=0.0)
+    p_e2e.add_argument("--interstitial-rate", type=float, default=0.0, help="share of pages served as a consent wall")
+    p_e2e.add_argument("--quota-after", type=int, default=0, help="Data API calls before quotaExceeded (0 = never)")
+    p_e2e.set_defaults(func=bench_e2e)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,320 @@
+"""Local stand-in for youtube.com and the Data API, for offline benchmarks.
+
+Serves search result pages, channel /about pages, the InnerTube search
+continuation endpoint and canned Data API JSON (channels, playlistItems,
+videos, search), with configurable latency, error rate, 429s, consent
+interstitials and Data API quota exhaustion.
+
+Run it on its own and point the scraper at it:
+
+    python fake_youtube.py --port 8700 [--pages saved_pages/] [--latency 0.05]
+    YOUTUBE_ORIGIN=http://127.0.0.1:8700 \\
+    YOUTUBE_API_BASE=http://127.0.0.1:8700/youtube/v3 YOUTUBE_API_KEY=fake python main.py
+
+With --pages, saved search pages (search*.html) and About pages (about*.html)
+are served instead of the small synthetic ones, so parsing costs match real
+traffic. Saved About pages are rewritten to carry the requested channel's id.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+@dataclass
+class FakeConfig:
+    latency: float = 0.0  # mean seconds added to every response
+    jitter: float = 0.0  # +/- seconds of uniform noise on the latency
+    error_rate: float = 0.0  # share of requests answered with 500
+    rate_429: float = 0.0  # share of requests answered with 429
+    interstitial_rate: float = 0.0  # share of page requests answered with a consent wall
+    quota_after: int = 0  # Data API calls before it answers 403 quotaExceeded; 0 = never
+    channels: int = 500  # distinct channels the synthetic search results draw from
+    per_page: int = 20  # channels per synthetic search page
+    videos: int = 8  # recent uploads per channel
+    seed: int = 0
+    search_pages: List[str] = field(default_factory=list)
+    about_pages: List[str] = field(default_factory=list)
+
+
+def _digest(text: str) -> int:
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest(), 16)
+
+
+def channel_id_for(name: str) -> str:
+    """Stable fake UC id for a handle, username or channel number."""
+    return "UC" + hashlib.sha1(name.lower().encode("utf-8")).hexdigest()[:22]
+
+
+def synthetic_search_page(query: str, config: FakeConfig) -> str:
+    start = _digest(query) % config.channels
+    renderers = []
+    for j in range(config.per_page):
+        n = (start + j) % config.channels
+        cid = channel_id_for(f"bench{n}")
+        # Alternate handle and /channel/ URLs so identity merging has work to do.
+        canonical = f"/@bench{n}" if n % 3 else f"/channel/{cid}"
+        renderers.append(
+            {
+                "channelRenderer": {
+                    "channelId": cid,
+                    "title": {"simpleText": f"Bench channel {n}"},
+                    "navigationEndpoint": {"browseEndpoint": {"browseId": cid, "canonicalBaseUrl": canonical}},
+                }
+            }
+        )
+    data = {"contents": {"sectionListRenderer": {"contents": [{"itemSectionRenderer": {"contents": renderers}}]}}}
+    return f"<html><body><script>var ytInitialData = {json.dumps(data)};</script></body></html>"
+
+
+def synthetic_about_page(name: str, cid: str) -> str:
+    data = {
+        "header": {"c4TabbedHeaderRenderer": {"subscriberCountText": {"simpleText": f"{_digest(cid) % 900 + 1} тыс. подписчиков"}}},
+        "metadata": {
+            "channelMetadataRenderer": {
+                "title": name,
+                "description": f"Обзоры авто. Сотрудничество: {name.lower()}@example.com",
+                "externalId": cid,
+            }
+        },
+    }
+    return (
+        f'<html><head><meta property="og:title" content="{name}">'
+        f'<meta name="description" content="Канал {name}"></head><body>'
+        f'<a href="https://t.me/{name.lower()}">Telegram</a>'
+        f'<a href="https://vk.com/{name.lower()}">VK</a>'
+        f"<script>var ytInitialData = {json.dumps(data, ensure_ascii=False)};</script></body></html>"
+    )
+
+
+CONSENT_PAGE = (
+    '<html><head><title>Before you continue to YouTube</title></head><body>'
+    '<form action="https://consent.youtube.com/save" method="POST"><button>Accept all</button></form>'
+    "</body></html>"
+)
+
+QUOTA_EXCEEDED = json.dumps(
+    {
+        "error": {
+            "code": 403,
+            "message": "The request cannot be completed because you have exceeded your quota.",
+            "errors": [{"domain": "youtube.quota", "reason": "quotaExceeded"}],
+        }
+    }
+)
+
+_EXTERNAL_ID_RE = re.compile(r'"externalId"\s*:\s*"(UC[\w-]+)"')
+
+
+def recorded_about_page(template: str, cid: str) -> str:
+    """A saved About page rewritten so it belongs to channel cid."""
+    m = _EXTERNAL_ID_RE.search(template)
+    return template.replace(m.group(1), cid) if m else template
+
+
+def channel_from_path(path: str) -> Tuple[str, str]:
+    """(display name, UC id) for a /@handle, /channel/UC.., /c/name or /user/name path."""
+    parts = [unquote(p) for p in path.strip("/").split("/")]
+    head = parts[0] if parts else ""
+    if head == "channel" and len(parts) > 1:
+        return parts[1], parts[1]
+    if head in ("c", "user") and len(parts) > 1:
+        return parts[1], channel_id_for(parts[1])
+    name = head.lstrip("@")
+    return name, channel_id_for(name)
+
+
+def api_response(endpoint: str, query: Dict[str, List[str]], config: FakeConfig) -> Dict[str, Any]:
+    """Canned Data API JSON shaped like the real endpoints the scraper calls."""
+
+    def arg(name: str) -> str:
+        return query.get(name, [""])[0]
+
+    if endpoint == "channels":
+        if arg("forHandle") or arg("forUsername"):
+            return {"items": [{"id": channel_id_for((arg("forHandle") or arg("forUsername")).lstrip("@"))}]}
+        items = []
+        for cid in filter(None, arg("id").split(",")):
+            seed = _digest(cid)
+            items.append(
+                {
+                    "id": cid,
+                    "contentDetails": {"relatedPlaylists": {"uploads": "UU" + cid[2:]}},
+                    "statistics": {
+                        "subscriberCount": str(seed % 1_000_000),
+                        "viewCount": str(seed % 100_000_000),
+                        "hiddenSubscriberCount": False,
+                    },
+                }
+            )
+        return {"items": items}
+    if endpoint == "playlistItems":
+        playlist = arg("playlistId")
+        now = datetime.now(timezone.utc)
+        items = []
+        for i in range(config.videos):
+            published = now - timedelta(days=i * 45 / max(1, config.videos))
+            items.append(
+                {
+                    "contentDetails": {
+                        "videoId": f"v{playlist[2:12]}{i:02d}",
+                        "videoPublishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    }
+                }
+            )
+        return {"items": items}
+    if endpoint == "videos":
+        ids = filter(None, arg("id").split(","))
+        return {"items": [{"id": vid, "statistics": {"viewCount": str(_digest(vid) % 50_000)}} for vid in ids]}
+    if endpoint == "search":
+        return {"items": [{"id": {"kind": "youtube#channel", "channelId": channel_id_for(arg("q"))}}]}
+    return {"error": {"code": 404, "message": f"unknown endpoint {endpoint}"}}
+
+
+class FakeYouTubeHandler(BaseHTTPRequestHandler):
+    config = FakeConfig()
+    protocol_version = "HTTP/1.1"
+    api_calls = 0
+    api_lock = threading.Lock()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _delay_or_fail(self) -> bool:
+        """Apply latency; answer with an injected 500/429 and return True if this request should fail."""
+        cfg = self.config
+        if cfg.latency or cfg.jitter:
+            time.sleep(max(0.0, cfg.latency + random.uniform(-cfg.jitter, cfg.jitter)))
+        roll = random.random()
+        if roll < cfg.rate_429:
+            self._send(429, "text/plain", "Too Many Requests", {"Retry-After": "1"})
+            return True
+        if roll < cfg.rate_429 + cfg.error_rate:
+            self._send(500, "text/plain", "Internal Server Error")
+            return True
+        return False
+
+    def _send(self, status: int, content_type: str, body: str, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        if self._delay_or_fail():
+            return
+        cfg = self.config
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.startswith("/youtube/v3/"):
+            with self.api_lock:
+                type(self).api_calls += 1
+                over_quota = cfg.quota_after and self.api_calls > cfg.quota_after
+            if over_quota:
+                self._send(403, "application/json", QUOTA_EXCEEDED)
+                return
+            endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+            self._send(200, "application/json", json.dumps(api_response(endpoint, query, cfg)))
+        elif random.random() < cfg.interstitial_rate:
+            self._send(200, "text/html", CONSENT_PAGE)
+        elif url.path == "/results":
+            q = query.get("search_query", [""])[0]
+            if cfg.search_pages:
+                body = cfg.search_pages[_digest(q) % len(cfg.search_pages)]
+            else:
+                body = synthetic_search_page(q, cfg)
+            self._send(200, "text/html", body)
+        elif url.path.strip("/"):
+            name, cid = channel_from_path(url.path)
+            if cfg.about_pages:
+                body = recorded_about_page(cfg.about_pages[_digest(cid) % len(cfg.about_pages)], cid)
+            else:
+                body = synthetic_about_page(name, cid)
+            self._send(200, "text/html", body)
+        else:
+            self._send(404, "text/plain", "Not Found")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if self._delay_or_fail():
+            return
+        # No further continuation pages: an empty InnerTube response ends pagination.
+        self._send(200, "application/json", "{}")
+
+
+def load_recorded(pages_dir: Optional[str], pattern: str) -> List[str]:
+    if not pages_dir:
+        return []
+    pages = []
+    for path in sorted(glob.glob(os.path.join(pages_dir, pattern))):
+        with open(path, encoding="utf-8") as fh:
+            pages.append(fh.read())
+    return pages
+
+
+def make_server(host: str, port: int, config: FakeConfig) -> ThreadingHTTPServer:
+    """Build (but don't start) a threaded fake server; port 0 picks a free port."""
+    random.seed(config.seed)
+    handler = type("ConfiguredHandler", (FakeYouTubeHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: str, port: int, config: FakeConfig, ready: Any = None) -> None:
+    """Serve forever; if given, ready (a multiprocessing queue) receives the bound port."""
+    server = make_server(host, port, config)
+    if ready is not None:
+        ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def parse_config(argv: Optional[List[str]] = None) -> Tuple[argparse.Namespace, FakeConfig]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--pages", help="directory with saved search*.html / about*.html pages")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--interstitial-rate", type=float, default=0.0)
+    parser.add_argument("--quota-after", type=int, default=0)
+    parser.add_argument("--channels", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    config = FakeConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_429=args.rate_429,
+        interstitial_rate=args.interstitial_rate,
+        quota_after=args.quota_after,
+        channels=args.channels,
+        seed=args.seed,
+        search_pages=load_recorded(args.pages, "search*.html"),
+        about_pages=load_recorded(args.pages, "about*.html"),
+    )
+    return args, config
+
+
+if __name__ == "__main__":
+    cli_args, cli_config = parse_config()
+    print(f"[INFO] Fake YouTube listening on http://{cli_args.host}:{cli_args.port}")
+    serve(cli_args.host, cli_args.port, cli_config)
@@ -1,15 +1,36 @@
+from __future__ import annotations
+
+import argparse
+import bisect
+import csv
+import hashlib
 import json
 import os
 import random
 import re
+import sqlite3
+import threading
 import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Iterable, List, Optional, Set
-from urllib.parse import quote_plus, unquote, urlparse
-
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+from urllib.parse import quote_plus, unquote, urlencode, urlparse
+
+# Heavy dependencies are imported where they are used, so each CLI stage pays only for what it
+# needs: requests/asyncio for network stages, bs4 for the bs4 HTML backend, openpyxl, pyarrow
+# and pandas for export.
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import requests
 
 # ------------------------------------------------------------
 # Configuration
@@ -20,13 +41,153 @@ HEADERS = {
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) "
         "Chrome/120.0 Safari/120.0"
-    )
+    ),
 }
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY", "").strip()
 YT_API_ENABLED = bool(YOUTUBE_API_KEY)
-if not YT_API_ENABLED:
-    print("[WARN] YOUTUBE_API_KEY is not set; 'Views Last 30 Days' will be empty for all channels.")
+# Persistent URL -> channelId resolutions, shared by every run for this user.
+CHANNEL_ID_CACHE_PATH = os.getenv(
+    "SCRAPER_ID_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "youtube-channel-scraper", "channel_ids.sqlite"),
+).strip()
+CHANNEL_ID_CACHE_TTL = int(os.getenv("SCRAPER_ID_CACHE_DAYS", "180")) * 24 * 3600
+CHANNEL_ID_CACHE_NEGATIVE_TTL = int(os.getenv("SCRAPER_ID_CACHE_NEGATIVE_HOURS", "24")) * 3600
+# Data API quota: units available per day and the unit cost of each endpoint (others cost 1).
+YT_API_DAILY_QUOTA = int(os.getenv("YOUTUBE_API_DAILY_QUOTA", "10000"))
+YT_API_UNIT_COSTS: Dict[str, int] = {
+    "search": 100,
+}
+# channels.list / videos.list lookups from concurrent channels are coalesced into calls of
+# up to 50 ids; a partial batch is sent after this many seconds.
+YT_API_BATCH_WAIT = float(os.getenv("YOUTUBE_API_BATCH_WAIT", "0.2"))
+
+# Where youtube.com pages and the Data API are fetched from; bench.py points these at a local fake.
+YOUTUBE_ORIGIN = os.getenv("YOUTUBE_ORIGIN", "https://www.youtube.com").rstrip("/")
+YT_API_BASE = os.getenv("YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3").rstrip("/")
+
+# Number of requests allowed in flight at once across the whole run.
+MAX_WORKERS = int(os.getenv("SCRAPER_WORKERS", "8"))
+# Politeness budget per host: sustained requests/second and burst size.
+HOST_RATE_PER_SEC = float(os.getenv("SCRAPER_HOST_RATE", "1.0"))
+HOST_BURST = int(os.getenv("SCRAPER_HOST_BURST", "3"))
+HOST_RATE_OVERRIDES: Dict[str, float] = {
+    urlparse(YT_API_BASE).netloc: float(os.getenv("SCRAPER_API_RATE", "10")),
+}
+# Retries for throttling, 5xx, network errors and interstitial pages, with jittered exponential backoff.
+HTTP_RETRIES = int(os.getenv("SCRAPER_RETRIES", "4"))
+RETRY_BASE_DELAY = float(os.getenv("SCRAPER_RETRY_BASE", "1.0"))
+RETRY_MAX_DELAY = 60.0
+# AIMD per-host pacing: halve the rate on throttling, add 5% of the configured rate back per success.
+AIMD_DECREASE = 0.5
+AIMD_INCREASE = 0.05
+AIMD_MIN_FRACTION = 0.05
+# Circuit breaker: pause a host after this many failures in a row, for a cooldown that doubles per trip.
+BREAKER_FAILURES = int(os.getenv("SCRAPER_BREAKER_FAILURES", "8"))
+BREAKER_COOLDOWN = float(os.getenv("SCRAPER_BREAKER_COOLDOWN", "30"))
+BREAKER_MAX_COOLDOWN = 600.0
+# Connection pooling: number of host pools kept and keep-alive connections per host.
+HTTP_POOL_HOSTS = int(os.getenv("SCRAPER_POOL_HOSTS", "4"))
+HTTP_POOL_PER_HOST = int(os.getenv("SCRAPER_POOL_PER_HOST", str(MAX_WORKERS)))
+
+CSV_FILENAME = "channels_auto_ru.csv"
+XLSX_FILENAME = "channels_auto_ru.xlsx"
+# Typed columnar copy of the export (written when pyarrow is installed); "" disables.
+PARQUET_FILENAME = os.getenv("SCRAPER_PARQUET", "channels_auto_ru.parquet").strip()
+PARQUET_ROW_GROUP = int(os.getenv("SCRAPER_PARQUET_ROW_GROUP", "10000"))
+EXPORT_COLUMNS: List[str] = [
+    "Channel URL",
+    "Name",
+    "Subscribers",
+    "Subscriber Count",
+    "Views Last 30 Days",
+    "Total Views",
+    "Description",
+    "Email",
+    "Telegram",
+    "Website",
+    "Instagram",
+    "VK",
+    "Facebook",
+]
+
+# Fetched pages kept in memory per run so /about is downloaded and decoded once per channel.
+PAGE_MEMO_SIZE = int(os.getenv("SCRAPER_PAGE_MEMO_SIZE", "64"))
+
+# Result pages fetched per search query (1 = first page only); later pages use continuation tokens.
+SEARCH_PAGE_DEPTH = int(os.getenv("SCRAPER_SEARCH_PAGES", "3"))
+INNERTUBE_DEFAULT_CLIENT_VERSION = "2.20240101.00.00"
+
+# Streaming pipeline: workers per stage and the bound on each hand-off queue.
+PIPELINE_SEARCH_WORKERS = int(os.getenv("SCRAPER_SEARCH_WORKERS", "4"))
+PIPELINE_ABOUT_WORKERS = int(os.getenv("SCRAPER_ABOUT_WORKERS", str(MAX_WORKERS)))
+# Views workers mostly wait on batched API calls, so more of them means fuller batches.
+PIPELINE_VIEWS_WORKERS = int(os.getenv("SCRAPER_VIEWS_WORKERS", "16"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("SCRAPER_QUEUE_SIZE", "100"))
+# Processes that parse fetched About pages off the GIL; 0 parses in the pipeline's thread pool.
+# The default leaves one core for the event loop and the fetching threads.
+PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", str(max(0, (os.cpu_count() or 1) - 1))))
+
+# Last-seen rows kept across runs for --incremental; set SCRAPER_STORE="" to disable.
+CHANNEL_STORE_PATH = os.getenv("SCRAPER_STORE", "channel_store.sqlite").strip()
+# How long each group of fields stays fresh before --incremental refreshes it, in seconds.
+FRESHNESS_POLICY: Dict[str, int] = {
+    "about": 7 * 24 * 3600,  # name, description, email, links
+    "subscribers": 24 * 3600,
+    "views": 24 * 3600,
+}
+# A group counts as stale this much before its window ends, so a scheduled run that starts
+# a little earlier than the previous one still refreshes it.
+FRESHNESS_SLACK = int(os.getenv("SCRAPER_FRESHNESS_SLACK", "3600"))
+
+# Intermediate files written and read by the discover/enrich/views/export subcommands.
+STAGE_DIR = os.getenv("SCRAPER_STAGE_DIR", "stages").strip() or "."
+STAGE_FILES: Dict[str, str] = {
+    "discover": "channels.jsonl",
+    "enrich": "about.jsonl",
+    "views": "rows.jsonl",
+}
+# Per-shard partials of the above for `--shard k/N`, e.g. rows.shard-2-of-4.jsonl; `merge` combines them.
+SHARD_SUFFIX = ".shard-{k}-of-{n}"
+
+# Per-query yield history used to order and prune SEARCH_QUERIES; set SCRAPER_QUERY_STATS="" to disable.
+QUERY_STATS_PATH = os.getenv("SCRAPER_QUERY_STATS", "query_stats.sqlite").strip()
+# Weight of the latest run in a query's smoothed yield (new channels it added).
+QUERY_YIELD_ALPHA = 0.5
+# Skip a query after this many consecutive runs without a new channel...
+QUERY_SKIP_AFTER = int(os.getenv("SCRAPER_QUERY_SKIP_AFTER", "3"))
+# ...but retry it after it has been skipped this many times, in case the results changed.
+QUERY_RETRY_AFTER = int(os.getenv("SCRAPER_QUERY_RETRY_AFTER", "10"))
+# Stop discovery once this many queries in a row added nothing new; 0 runs every scheduled query.
+QUERY_STOP_WINDOW = int(os.getenv("SCRAPER_QUERY_STOP_WINDOW", "25"))
+
+# Checkpoint journal for discovery and per-channel results (see --resume).
+JOURNAL_PATH = os.getenv("SCRAPER_JOURNAL", "scrape_journal.sqlite").strip()
+
+# HTML extraction backend for About pages: "lite" (streaming tokenizer) or "bs4".
+HTML_BACKEND = os.getenv("SCRAPER_HTML_BACKEND", "lite").strip().lower()
+
+# Persistent response cache; set SCRAPER_HTTP_CACHE="" to disable.
+HTTP_CACHE_PATH = os.getenv("SCRAPER_HTTP_CACHE", "http_cache.sqlite").strip()
+HTTP_CACHE_MAX_BYTES = int(os.getenv("SCRAPER_HTTP_CACHE_MAX_MB", "512")) * 1024 * 1024
+# Freshness per endpoint class, in seconds.
+HTTP_CACHE_TTLS: Dict[str, int] = {
+    "search": 6 * 3600,
+    "about": 24 * 3600,
+    "channel": 24 * 3600,
+    "api:search": 6 * 3600,
+    "api:videos": 3600,
+    "api:channels": 7 * 24 * 3600,  # ids and uploads playlists barely change
+    "api:channels:statistics": 3600,  # subscriber and view counts do
+    "api": 3600,
+}
+
+# Run metrics dump: Prometheus text for *.prom / *.txt paths, JSON otherwise; "" disables.
+METRICS_PATH = os.getenv("SCRAPER_METRICS", "scrape_metrics.json").strip()
+# Also rewrite the dump every N seconds while the run is going; 0 writes it only at the end.
+METRICS_INTERVAL = float(os.getenv("SCRAPER_METRICS_INTERVAL", "0"))
+# Upper bounds of the latency histogram buckets, in seconds.
+LATENCY_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
 
 SEARCH_QUERIES: List[str] = [
     "авто",
@@ -186,47 +347,859 @@ SEARCH_QUERIES: List[str] = [
     "грузовой авто блог",
 ]
 
+# ------------------------------------------------------------
+# Run metrics
+# ------------------------------------------------------------
+
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _metric_key(name: str, labels: Dict[str, Any]) -> MetricKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _bucket_quantile(buckets: List[float], q: float) -> float:
+    """Estimate a quantile as the upper bound of the bucket it falls in."""
+    total = sum(buckets)
+    if not total:
+        return 0.0
+    seen = 0.0
+    for bound, count in zip(LATENCY_BUCKETS, buckets):
+        seen += count
+        if seen >= q * total:
+            return bound
+    return float("inf")
+
+
+class Metrics:
+    """Thread-safe counters, gauges and latency histograms for one scrape run."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.counters: Dict[MetricKey, float] = {}
+        self.gauges: Dict[MetricKey, float] = {}
+        # Per-bucket (not cumulative) counts, one slot per LATENCY_BUCKETS bound plus +Inf, then the sum.
+        self.histograms: Dict[MetricKey, List[float]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self.gauges[_metric_key(name, labels)] = value
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [0.0] * (len(LATENCY_BUCKETS) + 2)
+            hist[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            hist[-1] += seconds
+
+    @contextmanager
+    def timed(self, name: str, **labels: Any) -> Iterator[None]:
+        """Record the block's wall time in the named latency histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.time()
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def state(self) -> Dict[str, Dict[MetricKey, Any]]:
+        """Picklable copy of the raw metrics, e.g. to ship from a worker process."""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "histograms": {k: list(v) for k, v in self.histograms.items()},
+            }
+
+    def merge(self, state: Dict[str, Dict[MetricKey, Any]]) -> None:
+        """Add counters and histograms recorded elsewhere; gauges take the incoming value."""
+        with self._lock:
+            for key, value in state["counters"].items():
+                self.counters[key] = self.counters.get(key, 0.0) + value
+            self.gauges.update(state["gauges"])
+            for key, values in state["histograms"].items():
+                hist = self.histograms.get(key)
+                if hist is None:
+                    self.histograms[key] = list(values)
+                else:
+                    for i, value in enumerate(values):
+                        hist[i] += value
+
+    def counter_total(self, name: str) -> float:
+        """Sum of a counter across all label sets."""
+        with self._lock:
+            return sum(v for (n, _), v in self.counters.items() if n == name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view with cumulative buckets and estimated p50/p95 per histogram."""
+        elapsed = time.time() - self.started
+        state = self.state()
+        histograms = []
+        for (name, labels), hist in sorted(state["histograms"].items()):
+            buckets, count = hist[:-1], sum(hist[:-1])
+            cumulative, running = {}, 0.0
+            for bound, n in zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], buckets):
+                running += n
+                cumulative[bound] = int(running)
+            histograms.append(
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": int(count),
+                    "sum": round(hist[-1], 6),
+                    "p50": _bucket_quantile(buckets, 0.5),
+                    "p95": _bucket_quantile(buckets, 0.95),
+                    "buckets": cumulative,
+                }
+            )
+        return {
+            "started": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            "elapsed_seconds": round(elapsed, 3),
+            "counters": [
+                {"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(state["counters"].items())
+            ],
+            "gauges": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(state["gauges"].items())],
+            "histograms": histograms,
+        }
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+
+        def fmt(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+            pairs = list(labels.items()) + ([extra] if extra else [])
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        snap = self.snapshot()
+        lines: List[str] = []
+        typed: Set[str] = set()
+
+        def declare(name: str, kind: str) -> None:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for item in snap["counters"]:
+            name = f"scraper_{item['name']}"
+            declare(name, "counter")
+            lines.append(f"{name}{fmt(item['labels'])} {item['value']:g}")
+        for item in snap["gauges"]:
+            name = f"scraper_{item['name']}"
+            declare(name, "gauge")
+            lines.append(f"{name}{fmt(item['labels'])} {item['value']:g}")
+        for item in snap["histograms"]:
+            name = f"scraper_{item['name']}"
+            declare(name, "histogram")
+            for bound, count in item["buckets"].items():
+                lines.append(f"{name}_bucket{fmt(item['labels'], ('le', bound))} {count}")
+            lines.append(f"{name}_sum{fmt(item['labels'])} {item['sum']:g}")
+            lines.append(f"{name}_count{fmt(item['labels'])} {item['count']}")
+        return "\n".join(lines) + "\n"
+
+
+_METRICS = Metrics()
+
+
+def metrics() -> Metrics:
+    """Return the run-wide metrics registry."""
+    return _METRICS
+
+
+def write_metrics(path: str) -> None:
+    """Refresh the derived gauges and atomically write the metrics dump to path."""
+    registry = metrics()
+    elapsed_min = max(time.time() - registry.started, 1e-9) / 60
+    registry.set_gauge("channels_per_minute", registry.counter_total("channels_finished_total") / elapsed_min)
+    if path.endswith((".prom", ".txt")):
+        body = registry.to_prometheus()
+    else:
+        body = json.dumps(registry.snapshot(), ensure_ascii=False, indent=2)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(body)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def periodic_metrics_export(path: str, interval: float) -> Iterator[None]:
+    """Rewrite the metrics dump every interval seconds while the block runs."""
+    if not path or interval <= 0:
+        yield
+        return
+    stop = threading.Event()
+
+    def export_loop() -> None:
+        while not stop.wait(interval):
+            try:
+                write_metrics(path)
+            except OSError as exc:
+                print(f"[WARN] Could not write metrics to {path}: {exc}")
+
+    thread = threading.Thread(target=export_loop, name="metrics-export", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def metrics_summary_lines() -> List[str]:
+    """One line per latency histogram plus the headline counters, for the end-of-run log."""
+    snap = metrics().snapshot()
+    lines = []
+    for item in snap["histograms"]:
+        labels = ",".join(f"{k}={v}" for k, v in item["labels"].items())
+        mean = item["sum"] / item["count"] if item["count"] else 0.0
+        lines.append(
+            f"{item['name']}{'{' + labels + '}' if labels else ''}: n={item['count']} "
+            f"mean={mean * 1000:.1f}ms p50<={item['p50'] * 1000:g}ms p95<={item['p95'] * 1000:g}ms"
+        )
+    return lines
+
+
+# ------------------------------------------------------------
+# HTTP response cache
+# ------------------------------------------------------------
+
+
+def endpoint_class(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Classify a URL into the endpoint class used for cache TTLs.
+
+    Data API calls that request statistics get their own, shorter-lived class.
+    """
+    parsed = urlparse(url)
+    if url.startswith(YT_API_BASE + "/"):
+        endpoint = parsed.path.rstrip("/").rsplit("/", 1)[-1]
+        parts = str((params or {}).get("part", "")).split(",")
+        for name in (f"api:{endpoint}:statistics" if "statistics" in parts else "", f"api:{endpoint}"):
+            if name in HTTP_CACHE_TTLS:
+                return name
+        return "api"
+    if parsed.path.startswith("/results"):
+        return "search"
+    if parsed.path.rstrip("/").endswith("/about"):
+        return "about"
+    return "channel"
+
+
+def cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable cache key for a URL plus query params (API key excluded)."""
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if k != "key")
+    raw = url + ("?" + urlencode(items) if items else "")
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CachedResponse:
+    """A stored response body plus its validators."""
+
+    __slots__ = ("body", "etag", "last_modified", "stored_at", "endpoint")
+
+    def __init__(self, body: str, etag: str, last_modified: str, stored_at: float, endpoint: str) -> None:
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.endpoint = endpoint
+
+    def is_fresh(self, endpoint: Optional[str] = None) -> bool:
+        """Whether the entry is within the TTL of endpoint (by default the class it was stored under)."""
+        ttl = HTTP_CACHE_TTLS.get(endpoint or self.endpoint, HTTP_CACHE_TTLS["api"])
+        return time.time() - self.stored_at < ttl
+
+    def validators(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTLs and size-bounded LRU eviction."""
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT NOT NULL DEFAULT '',
+                last_modified TEXT NOT NULL DEFAULT '',
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self._total_bytes = int(row[0])
+
+    def _failed(self, operation: str, exc: Exception) -> None:
+        """Count a database error (e.g. locked by another shard's process); warn about the first one."""
+        self.errors += 1
+        metrics().inc("http_cache_errors_total", operation=operation)
+        if self.errors == 1:
+            print(f"[WARN] HTTP cache {operation} failed ({exc}); treating it as a miss")
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """The stored entry for key, or None when absent or the database can't be read."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT body, etag, last_modified, stored_at, endpoint FROM responses WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+        except sqlite3.Error as exc:
+            self._failed("read", exc)
+            return None
+        body = zlib.decompress(row[0]).decode("utf-8")
+        return CachedResponse(body, row[1], row[2], row[3], row[4])
+
+    def put(self, key: str, url: str, endpoint: str, body: str, etag: str = "", last_modified: str = "") -> None:
+        blob = zlib.compress(body.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            total_before = self._total_bytes
+            try:
+                old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, url, endpoint, body, etag, last_modified, stored_at, accessed_at, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, endpoint, blob, etag, last_modified, now, now, len(blob)),
+                )
+                self._total_bytes += len(blob) - (old[0] if old else 0)
+                self._evict_locked()
+                self._conn.commit()
+                return
+            except sqlite3.Error as exc:
+                self._total_bytes = total_before
+                self._rollback_locked()
+                error = exc
+        self._failed("write", error)
+
+    def touch(self, key: str) -> None:
+        """Mark a revalidated entry as fresh again."""
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+                )
+                self._conn.commit()
+                return
+            except sqlite3.Error as exc:
+                self._rollback_locked()
+                error = exc
+        self._failed("write", error)
+
+    def _rollback_locked(self) -> None:
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _evict_locked(self) -> None:
+        while self._total_bytes > self.max_bytes:
+            victims = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not victims:
+                self._total_bytes = 0
+                return
+            for key, size in victims:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+
+_CACHE: Optional[ResponseCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def response_cache() -> Optional[ResponseCache]:
+    """Return the shared response cache, or None when caching is disabled."""
+    global _CACHE
+    if not HTTP_CACHE_PATH:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            try:
+                _CACHE = ResponseCache(HTTP_CACHE_PATH, HTTP_CACHE_MAX_BYTES)
+            except sqlite3.Error as exc:
+                print(f"[WARN] HTTP cache disabled ({HTTP_CACHE_PATH}): {exc}")
+                return None
+        return _CACHE
+
+
 # ------------------------------------------------------------
 # Utilities
 # ------------------------------------------------------------
 
 
-def sleep_briefly() -> None:
-    """Pause a short time between network calls."""
-    time.sleep(random.uniform(1.0, 2.0))
+class TokenBucket:
+    """Thread-safe token bucket that paces requests to a single host, with an AIMD-adjusted rate."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = rate * AIMD_MIN_FRACTION
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            # Small jitter keeps concurrent workers from waking in lockstep.
+            wait += random.uniform(0.0, 0.25 / self.rate)
+            metrics().inc("rate_limit_sleep_seconds_total", wait)
+            time.sleep(wait)
+
+    def slow_down(self) -> float:
+        """Multiplicative decrease after throttling; returns the new rate."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * AIMD_DECREASE)
+            return self.rate
+
+    def speed_up(self) -> float:
+        """Additive increase after a healthy response, up to the configured rate."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * AIMD_INCREASE)
+            return self.rate
+
+
+class CircuitBreaker:
+    """Pauses a host after repeated failures; once the cooldown ends a single probe decides whether to resume."""
+
+    def __init__(self, host: str, threshold: int, cooldown: float, max_cooldown: float) -> None:
+        self.host = host
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.trips = 0
+        self._failures = 0
+        self._open_until = 0.0
+        self._open = False
+        self._probing = False
+        self._cond = threading.Condition()
+
+    def before_request(self) -> bool:
+        """Block while the breaker is open; after the cooldown let one probe request through.
+
+        Returns True for the probe, whose caller must settle it with record_success,
+        record_failure or release_probe.
+        """
+        with self._cond:
+            while self._open:
+                now = time.monotonic()
+                if now < self._open_until:
+                    self._cond.wait(self._open_until - now)
+                elif not self._probing:
+                    self._probing = True
+                    return True
+                else:
+                    self._cond.wait(1.0)
+            return False
+
+    def release_probe(self) -> None:
+        """Give up an unsettled probe so another waiting request can take it."""
+        with self._cond:
+            if self._probing:
+                self._probing = False
+                self._cond.notify_all()
+
+    def record_success(self) -> None:
+        with self._cond:
+            self._failures = 0
+            if self._open:
+                print(f"[INFO] {self.host} is answering again; resuming requests")
+                self._open = self._probing = False
+                self._cond.notify_all()
+
+    def record_failure(self) -> None:
+        with self._cond:
+            self._failures += 1
+            if not (self._probing or (not self._open and self._failures >= self.threshold)):
+                return
+            self.trips += 1
+            pause = min(self.max_cooldown, self.cooldown * 2 ** (self.trips - 1))
+            self._open, self._probing = True, False
+            self._open_until = time.monotonic() + pause
+            failures = self._failures
+            self._cond.notify_all()
+        metrics().inc("circuit_breaker_trips_total", host=self.host)
+        print(f"[WARN] {self.host}: {failures} failed requests in a row; pausing it for {pause:.1f}s")
+
+
+_HOST_BUCKETS: Dict[str, TokenBucket] = {}
+_HOST_BUCKETS_LOCK = threading.Lock()
+
+
+def host_bucket(url: str) -> TokenBucket:
+    """Return the shared rate limiter for the URL's host."""
+    host = urlparse(url).netloc.lower()
+    with _HOST_BUCKETS_LOCK:
+        bucket = _HOST_BUCKETS.get(host)
+        if bucket is None:
+            rate = HOST_RATE_OVERRIDES.get(host, HOST_RATE_PER_SEC)
+            bucket = TokenBucket(rate, HOST_BURST)
+            _HOST_BUCKETS[host] = bucket
+        return bucket
+
+
+_HOST_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def host_breaker(url: str) -> CircuitBreaker:
+    """Return the shared circuit breaker for the URL's host."""
+    host = urlparse(url).netloc.lower()
+    with _HOST_BUCKETS_LOCK:
+        breaker = _HOST_BREAKERS.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host, BREAKER_FAILURES, BREAKER_COOLDOWN, BREAKER_MAX_COOLDOWN)
+            _HOST_BREAKERS[host] = breaker
+        return breaker
+
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def http_session() -> requests.Session:
+    """Return the process-wide pooled session used for HTML and Data API calls."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.request import ACCEPT_ENCODING
+
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            # urllib3 advertises br/zstd only when the matching decoder is installed.
+            session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_PER_HOST)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSION = session
+        return _SESSION
+
+
+def connection_stats() -> Dict[str, int]:
+    """Summarize how many requests reused a pooled keep-alive connection."""
+    stats = {"requests": 0, "new_connections": 0, "reused": 0}
+    if _SESSION is None:
+        return stats
+    from requests.adapters import HTTPAdapter
+
+    seen: Set[int] = set()
+    for adapter in _SESSION.adapters.values():
+        if not isinstance(adapter, HTTPAdapter) or id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats["requests"] += pool.num_requests
+            stats["new_connections"] += pool.num_connections
+    stats["reused"] = max(0, stats["requests"] - stats["new_connections"])
+    return stats
+
+
+def http_get_text(url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 20) -> str:
+    """GET through the response cache and pooled session; raise on HTTP errors."""
+    return http_get(url, params, timeout)[0]
+
+
+class BlockedResponseError(IOError):
+    """A request that still failed after retries, or hit the Data API's quota, classified by outcome."""
+
+    def __init__(self, outcome: str, url: str) -> None:
+        super().__init__(f"{outcome} for {url}")
+        self.outcome = outcome
+
+
+# Outcomes worth retrying, and those that also mean "slow down" for the host.
+RETRYABLE_OUTCOMES = {"throttled", "server_error", "network", "interstitial"}
+THROTTLE_OUTCOMES = {"throttled", "interstitial"}
+_QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+_RATE_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+
+def api_error_reasons(text: str) -> Set[str]:
+    """The 'reason' codes of a Data API error body, if it is one."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return set()
+    errors = data.get("error", {}).get("errors", []) if isinstance(data, dict) else []
+    return {e.get("reason", "") for e in errors if isinstance(e, dict)}
+
+
+def classify_response(endpoint: str, resp: requests.Response, text: str) -> str:
+    """ok, not_modified, client_error, throttled, server_error, quota or interstitial."""
+    status = resp.status_code
+    if status == 304:
+        return "not_modified"
+    if status == 429:
+        return "throttled"
+    if status >= 500:
+        return "server_error"
+    if status == 403 and endpoint.startswith("api"):
+        reasons = api_error_reasons(text)
+        if reasons & _QUOTA_REASONS:
+            return "quota"
+        if reasons & _RATE_REASONS:
+            return "throttled"
+    if status >= 400:
+        return "client_error"
+    # Consent walls and captchas come back as 200 pages without ytInitialData.
+    if endpoint in ("search", "about", "channel"):
+        if urlparse(resp.url).netloc.startswith("consent.") or "ytInitialData" not in text:
+            return "interstitial"
+    return "ok"
+
+
+def retry_delay(attempt: int, resp: Optional[requests.Response]) -> float:
+    """Full-jitter exponential backoff, never shorter than a Retry-After header asks for."""
+    delay = random.uniform(0.0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    retry_after = resp.headers.get("Retry-After", "") if resp is not None else ""
+    if retry_after.isdigit():
+        delay = max(delay, min(RETRY_MAX_DELAY, float(retry_after)))
+    return delay
+
+
+def send_with_retries(
+    method: str, url: str, endpoint: str, **kwargs: Any
+) -> Tuple[requests.Response, str]:
+    """Send a request through the host's breaker and adaptive rate limiter, retrying transient failures.
+
+    Returns the response and its text once it is ok, not modified or a plain client error
+    (left for the caller's raise_for_status); raises BlockedResponseError when retries run
+    out or the Data API reports its quota exhausted.
+    """
+    import requests
+
+    bucket, breaker, registry = host_bucket(url), host_breaker(url), metrics()
+    for attempt in range(HTTP_RETRIES + 1):
+        probe = breaker.before_request()
+        try:
+            bucket.acquire()
+            registry.inc("http_requests_total", endpoint=endpoint)
+            resp: Optional[requests.Response] = None
+            text = ""
+            try:
+                resp = http_session().request(method, url, **kwargs)
+            except requests.RequestException:
+                outcome = "network"
+            else:
+                registry.inc("http_response_bytes_total", len(resp.content), endpoint=endpoint)
+                text = resp.text
+                outcome = classify_response(endpoint, resp, text)
+            if outcome in ("ok", "not_modified", "client_error", "quota"):
+                # An exhausted quota is still an answer from a healthy host.
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+        finally:
+            if probe:
+                breaker.release_probe()
+        if outcome in ("ok", "not_modified", "client_error"):
+            bucket.speed_up()
+            if outcome == "client_error":
+                registry.inc("http_failures_total", endpoint=endpoint, reason=str(resp.status_code))
+            return resp, text
+        registry.inc("http_failures_total", endpoint=endpoint, reason=outcome)
+        if outcome == "quota":
+            raise BlockedResponseError(outcome, url)
+        if outcome in THROTTLE_OUTCOMES:
+            rate = bucket.slow_down()
+            registry.set_gauge("host_rate_per_sec", rate, host=urlparse(url).netloc)
+        if attempt == HTTP_RETRIES:
+            break
+        delay = retry_delay(attempt, resp)
+        registry.inc("http_retries_total", endpoint=endpoint, reason=outcome)
+        registry.inc("retry_sleep_seconds_total", delay)
+        print(f"[RETRY] {outcome} from {url.split('?', 1)[0]}; attempt {attempt + 2} in {delay:.1f}s")
+        time.sleep(delay)
+    raise BlockedResponseError(outcome, url)
+
+
+def http_get(url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 20) -> Tuple[str, bool]:
+    """Like http_get_text, also reporting whether a fresh cache entry answered without a request."""
+    cache = response_cache()
+    key = cache_key(url, params)
+    endpoint = endpoint_class(url, params)
+    registry = metrics()
+    cached = cache.get(key) if cache else None
+    if cached is not None and cached.is_fresh(endpoint):
+        cache.hits += 1
+        registry.inc("http_cache_hits_total", endpoint=endpoint)
+        return cached.body, True
+
+    headers = cached.validators() if cached is not None else {}
+    resp, text = send_with_retries("GET", url, endpoint, params=params, headers=headers, timeout=timeout)
+    if resp.status_code == 304 and cached is not None:
+        cache.revalidated += 1
+        registry.inc("http_cache_revalidated_total", endpoint=endpoint)
+        cache.touch(key)
+        return cached.body, False
+    resp.raise_for_status()
+    if cache is not None:
+        cache.misses += 1
+        cache.put(
+            key,
+            url,
+            endpoint,
+            text,
+            etag=resp.headers.get("ETag", ""),
+            last_modified=resp.headers.get("Last-Modified", ""),
+        )
+    return text, False
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def _gather_bounded(func: Callable[[T], R], items: List[T], workers: int) -> List[R]:
+    """Run blocking func over items on a worker pool, at most `workers` at a time."""
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+
+        async def run(item: T) -> R:
+            async with semaphore:
+                return await loop.run_in_executor(pool, func, item)
+
+        return await asyncio.gather(*(run(item) for item in items))
+
+
+def run_concurrently(func: Callable[[T], R], items: Iterable[T], workers: Optional[int] = None) -> List[R]:
+    """Apply func to every item with bounded concurrency (MAX_WORKERS by default); results keep input order."""
+    import asyncio
+
+    items = list(items)
+    if not items:
+        return []
+    return asyncio.run(_gather_bounded(func, items, max(1, workers or MAX_WORKERS)))
+
+
+# Statuses that definitively say a page does not exist, unlike network errors or throttling.
+GONE_STATUSES = {404, 410}
 
 
 def fetch_html(url: str) -> Optional[str]:
     """GET a URL and return HTML text; log and return None on failure."""
+    return fetch_html_status(url)[0]
+
+
+def fetch_html_status(url: str) -> Tuple[Optional[str], bool]:
+    """Like fetch_html, also telling whether a failure was a 404/410 (the page is gone)."""
     try:
         print(f"[GET] {url}")
-        resp = requests.get(url, headers=HEADERS, timeout=20)
+        with metrics().timed("fetch_html_seconds", endpoint=endpoint_class(url)):
+            return http_get_text(url, timeout=20), False
+    except Exception as exc:
+        print(f"[WARN] Request failed for {url}: {exc}")
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+        return None, status in GONE_STATUSES
+
+
+def post_json(url: str, payload: Dict[str, Any], timeout: float = 20) -> Optional[Dict[str, Any]]:
+    """POST a JSON body through the pooled session, with retries; log and return None on failure."""
+    try:
+        print(f"[POST] {url.split('?', 1)[0]}")
+        resp, text = send_with_retries("POST", url, "innertube", json=payload, timeout=timeout)
         resp.raise_for_status()
-        return resp.text
+        data = json.loads(text)
+        return data if isinstance(data, dict) else None
     except Exception as exc:
         print(f"[WARN] Request failed for {url}: {exc}")
         return None
-    finally:
-        sleep_briefly()
 
 
-def extract_ytinitialdata(html: str) -> Optional[Dict[str, Any]]:
-    """Extract ytInitialData JSON from HTML."""
-    patterns = [
-        r'ytInitialData"\s*:\s*({.*?})\s*;',
-        r"var ytInitialData\s*=\s*({.*?});",
-        r"ytInitialData\s*=\s*({.*?});",
-        r'window\["ytInitialData"\]\s*=\s*({.*?});',
-    ]
-    for pat in patterns:
-        m = re.search(pat, html, re.S)
-        if not m:
+_INITIAL_PAYLOAD_RE = re.compile(r'(ytInitialData|ytInitialPlayerResponse)"?\]?\s*[:=]\s*(?=\{)')
+_JSON_DECODER = json.JSONDecoder()
+
+
+def extract_initial_payloads(html: str, include_player: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Decode ytInitialData (and optionally ytInitialPlayerResponse) in one scan of the HTML."""
+    wanted = {"ytInitialData", "ytInitialPlayerResponse"} if include_player else {"ytInitialData"}
+    found: Dict[str, Dict[str, Any]] = {}
+    for m in _INITIAL_PAYLOAD_RE.finditer(html):
+        name = m.group(1)
+        if name not in wanted or name in found:
             continue
         try:
-            return json.loads(m.group(1))
+            obj, _ = _JSON_DECODER.raw_decode(html, m.end())
         except json.JSONDecodeError:
             continue
-    return None
+        if isinstance(obj, dict):
+            found[name] = obj
+            if len(found) == len(wanted):
+                break
+    return found
+
+
+def extract_ytinitialdata(html: str) -> Optional[Dict[str, Any]]:
+    """Extract ytInitialData JSON from HTML."""
+    with metrics().timed("extract_ytinitialdata_seconds"):
+        return extract_initial_payloads(html).get("ytInitialData")
+
+
+def extract_player_response(html: str) -> Optional[Dict[str, Any]]:
+    """Extract ytInitialPlayerResponse JSON from HTML."""
+    return extract_initial_payloads(html, include_player=True).get("ytInitialPlayerResponse")
 
 
 def text_from_runs(obj: Any) -> str:
@@ -276,57 +1249,269 @@ def channel_url_from_renderer(renderer: Dict[str, Any]) -> Optional[str]:
     canonical = endpoint.get("canonicalBaseUrl")
     browse_id = endpoint.get("browseId")
     if canonical:
-        return f"https://www.youtube.com{canonical}"
+        return f"{YOUTUBE_ORIGIN}{canonical}"
     if browse_id:
-        return f"https://www.youtube.com/channel/{browse_id}"
+        return f"{YOUTUBE_ORIGIN}/channel/{browse_id}"
+    return None
+
+
+def channel_id_from_renderer(renderer: Dict[str, Any]) -> str:
+    """Return the UC channelId carried by a channelRenderer, or ''."""
+    cid = renderer.get("channelId")
+    if not isinstance(cid, str) or not cid.startswith("UC"):
+        cid = renderer.get("navigationEndpoint", {}).get("browseEndpoint", {}).get("browseId")
+    return cid if isinstance(cid, str) and cid.startswith("UC") else ""
+
+
+def channels_from_search_data(data: Any) -> Dict[str, str]:
+    """Channel URL -> UC channelId ('' if absent) from a results page or continuation response."""
+    channels: Dict[str, str] = {}
+    for renderer in iter_channel_renderers(data):
+        ch_url = channel_url_from_renderer(renderer)
+        if ch_url:
+            channels[ch_url] = channel_id_from_renderer(renderer) or channels.get(ch_url, "")
+    return channels
+
+
+def continuation_token(data: Any) -> Optional[str]:
+    """Return the next-page continuation token from search results, if any."""
+    for command in walk_for_key(data, "continuationCommand"):
+        if isinstance(command, dict) and isinstance(command.get("token"), str):
+            return command["token"]
     return None
 
 
-def search_channels(query: str) -> Set[str]:
-    """Search YouTube for channels for a given query."""
-    url = f"https://www.youtube.com/results?search_query={quote_plus(query)}&sp=EgIQAg%253D%253D"
+def innertube_client(html: str) -> Dict[str, str]:
+    """Read the InnerTube API key and web client version from a page's ytcfg."""
+    key = re.search(r'"INNERTUBE_API_KEY"\s*:\s*"([^"]+)"', html)
+    version = re.search(r'"INNERTUBE_CLIENT_VERSION"\s*:\s*"([^"]+)"', html)
+    return {
+        "key": key.group(1) if key else "",
+        "version": version.group(1) if version else INNERTUBE_DEFAULT_CLIENT_VERSION,
+    }
+
+
+def fetch_search_continuation(token: str, client: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """Fetch the next page of search results for a continuation token."""
+    url = f"{YOUTUBE_ORIGIN}/youtubei/v1/search"
+    if client.get("key"):
+        url += f"?key={client['key']}"
+    payload = {
+        "context": {"client": {"clientName": "WEB", "clientVersion": client["version"]}},
+        "continuation": token,
+    }
+    return post_json(url, payload)
+
+
+class SharedSeen:
+    """Thread-safe set of channel ids seen by any concurrent search so far."""
+
+    def __init__(self) -> None:
+        self._seen: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def add_new(self, items: Iterable[str]) -> int:
+        """Add items and return how many were not seen before."""
+        with self._lock:
+            before = len(self._seen)
+            self._seen.update(items)
+            return len(self._seen) - before
+
+
+def identity_key(channel_url: str, channel_id: str) -> str:
+    """Dedup key for a channel: its UC id when known, else the URL itself."""
+    return channel_id or channel_url
+
+
+class ChannelIdentityIndex:
+    """Canonical channels keyed by UC channelId, remembering every URL alias seen for each.
+
+    The first URL registered for a channel is its canonical URL; later /@handle,
+    /c/, /user/ or /channel/ URLs for the same id are recorded as aliases only.
+    """
+
+    def __init__(self) -> None:
+        self._canonical: Dict[str, str] = {}
+        self._ids: Dict[str, str] = {}
+        self._aliases: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def add_many(self, found: Dict[str, str]) -> Dict[str, str]:
+        """Register URL -> channelId pairs; return the ones that are new channels."""
+        new: Dict[str, str] = {}
+        with self._lock:
+            for channel_url, channel_id in found.items():
+                key = identity_key(channel_url, channel_id)
+                self._aliases.setdefault(key, set()).add(channel_url)
+                if key in self._canonical:
+                    continue
+                self._canonical[key] = channel_url
+                self._ids[channel_url] = channel_id
+                new[channel_url] = channel_id
+        return new
+
+    def channel_id(self, channel_url: str) -> str:
+        """UC id recorded for a canonical URL, or ''."""
+        with self._lock:
+            return self._ids.get(channel_url, "")
+
+    def urls(self) -> Set[str]:
+        """Canonical URL of every known channel."""
+        with self._lock:
+            return set(self._canonical.values())
+
+    def merged_aliases(self) -> int:
+        """How many extra URLs were folded into an already known channel."""
+        with self._lock:
+            return sum(len(aliases) - 1 for aliases in self._aliases.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._canonical)
+
+
+def _identity_keys(found: Dict[str, str]) -> List[str]:
+    return [identity_key(url, cid) for url, cid in found.items()]
+
+
+def search_channels(
+    query: str,
+    max_pages: int = SEARCH_PAGE_DEPTH,
+    seen: Optional[SharedSeen] = None,
+) -> Optional[Dict[str, str]]:
+    """Search YouTube for channels for a given query; return channel URL -> UC channelId.
+
+    Follows continuation tokens up to max_pages result pages; when a shared seen set is
+    given, paging stops early as soon as a page adds no channel that isn't already known.
+    Returns None when no results page could be fetched, as opposed to {} for no results.
+    """
+    url = f"{YOUTUBE_ORIGIN}/results?search_query={quote_plus(query)}&sp=EgIQAg%253D%253D"
     html = fetch_html(url)
     if not html:
-        return set()
+        return None
     data = extract_ytinitialdata(html)
     if not data:
         print(f"[WARN] ytInitialData missing for search query {query!r}")
-        return set()
-    channels: Set[str] = set()
-    for renderer in iter_channel_renderers(data):
-        ch_url = channel_url_from_renderer(renderer)
-        if ch_url:
-            channels.add(ch_url)
-    print(f"[INFO] Found {len(channels)} channels for query {query!r}")
+        return None
+    channels = channels_from_search_data(data)
+    client = innertube_client(html)
+    page_channels = channels
+    pages = 1
+    while pages < max_pages:
+        if seen is not None and not seen.add_new(_identity_keys(page_channels)):
+            break
+        token = continuation_token(data)
+        if not token:
+            break
+        data = fetch_search_continuation(token, client)
+        if not data:
+            break
+        pages += 1
+        page_channels = channels_from_search_data(data)
+        channels.update(page_channels)
+    if seen is not None:
+        seen.add_new(_identity_keys(page_channels))
+    print(f"[INFO] Found {len(channels)} channels for query {query!r} ({pages} page(s))")
     return channels
 
+
 # ------------------------------------------------------------
 # Parsing helpers
 # ------------------------------------------------------------
 
 
+_SUBSCRIBER_WORD_RE = re.compile(r"подпис\w+|subscribers?|жазылушы")
+_MILLION_RE = re.compile(r"млн\.?|million|mln|\bm\b|\bм\b")
+_THOUSAND_RE = re.compile(r"тыс\.?|тысяч|k|\bк\b|мың")
+_NUMBER_RE = re.compile(r"[\d.]+")
+
+
 def clean_subscriber_text(raw_text: str) -> str:
     """Normalize subscriber count text, keep numeric + unit."""
     if not raw_text:
         return ""
     t = raw_text.lower().replace("\xa0", " ").replace(",", ".")
-    t = re.sub(r"подпис\w+", "", t)
-    t = t.replace("subscribers", "").replace("subscriber", "").replace("жазылушы", "")
-    t = t.replace(" ", "")
+    t = _SUBSCRIBER_WORD_RE.sub("", t).replace(" ", "")
     multiplier = ""
-    if re.search(r"(млн\.?|million|mln|\bm\b|\bм\b)", t):
+    if _MILLION_RE.search(t):
         multiplier = "млн"
-        t = re.sub(r"(млн\.?|million|mln|\bm\b|\bм\b)", "", t)
-    elif re.search(r"(тыс\.?|тысяч|k|\bк\b|мың|\bk\b)", t):
+        t = _MILLION_RE.sub("", t)
+    elif _THOUSAND_RE.search(t):
         multiplier = "тыс."
-        t = re.sub(r"(тыс\.?|тысяч|k|\bк\b|мың|\bk\b)", "", t)
-    num_match = re.search(r"([\d.]+)", t)
+        t = _THOUSAND_RE.sub("", t)
+    num_match = _NUMBER_RE.search(t)
     if not num_match:
         return ""
-    num = num_match.group(1).strip(".")
+    num = num_match.group(0).strip(".")
     return f"{num} {multiplier}".strip() if multiplier else num
 
 
+# A count in Russian, Kazakh or English text: digits with space/dot/comma separators and an
+# optional unit word. One-letter units must end the word so "12 min" is not 12 million.
+_COUNT_RE = re.compile(
+    r"(?P<num>\d[\d\s.,]*)\s*"
+    r"(?P<unit>thousand|million|billion|mln|bln|млрд|млн|тыс|мың|(?:k|m|b|к|м)(?![a-zа-яё]))?",
+    re.IGNORECASE,
+)
+_COUNT_SPACE_RE = re.compile(r"\s+")
+_COUNT_UNITS: Dict[str, int] = {
+    "k": 1_000,
+    "к": 1_000,
+    "тыс": 1_000,
+    "мың": 1_000,
+    "thousand": 1_000,
+    "m": 1_000_000,
+    "м": 1_000_000,
+    "млн": 1_000_000,
+    "million": 1_000_000,
+    "mln": 1_000_000,
+    "b": 1_000_000_000,
+    "bln": 1_000_000_000,
+    "млрд": 1_000_000_000,
+    "billion": 1_000_000_000,
+}
+
+
+def count_from_text(text: str) -> Optional[int]:
+    """Integer behind a count such as '1,2 млн подписчиков', '350 тыс.', '12K' or '1 234 views'.
+
+    With a unit, ',' and '.' are decimal marks; without one the count is whole, so they
+    are thousands separators. Scalar twin of normalize_counts.
+    """
+    m = _COUNT_RE.search(text) if text else None
+    if not m:
+        return None
+    digits = _COUNT_SPACE_RE.sub("", m.group("num")).rstrip(".,")
+    unit = m.group("unit")
+    try:
+        if unit:
+            return int(round(float(digits.replace(",", ".")) * _COUNT_UNITS[unit.lower()]))
+        return int(digits.replace(".", "").replace(",", ""))
+    except ValueError:
+        return None
+
+
+def normalize_counts(values: Iterable[Optional[str]]) -> "pd.Series":
+    """Vectorized count_from_text over a whole column; returns a nullable Int64 series.
+
+    Count columns repeat heavily ("1,2 тыс." on thousands of rows), so each distinct
+    string is parsed once and the results are broadcast back by factorized codes.
+    """
+    import pandas as pd
+
+    text = pd.Series(list(values), dtype="string")
+    codes, uniques = pd.factorize(text)
+    parts = pd.Series(uniques, dtype="string").str.extract(_COUNT_RE)
+    digits = parts["num"].str.replace(_COUNT_SPACE_RE, "", regex=True).str.rstrip(".,")
+    unit = parts["unit"].str.lower()
+    decimal = digits.str.replace(",", ".", regex=False)
+    whole = digits.str.replace(".", "", regex=False).str.replace(",", "", regex=False)
+    number = pd.to_numeric(decimal.where(unit.notna(), whole), errors="coerce").astype("Float64")
+    scale = unit.map(_COUNT_UNITS).astype("Float64").fillna(1)
+    counts = (number * scale).round().astype("Int64").array
+    return pd.Series(counts.take(codes, allow_fill=True), index=text.index)
+
+
 def first_email_in_text(text: str) -> str:
     """Return first email in text if present."""
     if not text:
@@ -335,34 +1520,163 @@ def first_email_in_text(text: str) -> str:
     return emails[0] if emails else ""
 
 
-def extract_links_from_json(data: Any) -> List[str]:
-    """Collect URL-like strings from ytInitialData."""
-    links: List[str] = []
+class PageIndex:
+    """Fields parse_about_page and resolve_channel_id need, gathered in one walk of ytInitialData."""
+
+    __slots__ = ("subscriber_texts", "links", "external_ids", "channel_ids", "strings")
 
-    def walk(node: Any) -> None:
+    def __init__(self, data: Any = None) -> None:
+        self.subscriber_texts: List[Any] = []
+        self.links: List[str] = []
+        self.external_ids: List[str] = []
+        self.channel_ids: List[str] = []
+        self.strings: List[str] = []
+        if data is not None:
+            self._visit(data)
+
+    def _visit(self, node: Any) -> None:
         if isinstance(node, dict):
+            if "subscriberCountText" in node:
+                self.subscriber_texts.append(node["subscriberCountText"])
             for key in ("url", "href"):
                 if isinstance(node.get(key), str):
-                    links.append(node[key])
-            if "navigationEndpoint" in node:
-                url_ep = node["navigationEndpoint"].get("urlEndpoint", {}).get("url")
-                if isinstance(url_ep, str):
-                    links.append(url_ep)
-            if "webCommandMetadata" in node and isinstance(node.get("webCommandMetadata"), dict):
-                meta = node["webCommandMetadata"]
-                if isinstance(meta.get("url"), str):
-                    links.append(meta["url"])
+                    self.links.append(node[key])
+            nav = node.get("navigationEndpoint")
+            if isinstance(nav, dict):
+                url_ep = nav.get("urlEndpoint")
+                if isinstance(url_ep, dict) and isinstance(url_ep.get("url"), str):
+                    self.links.append(url_ep["url"])
+            meta = node.get("webCommandMetadata")
+            if isinstance(meta, dict) and isinstance(meta.get("url"), str):
+                self.links.append(meta["url"])
+            if isinstance(node.get("externalId"), str):
+                self.external_ids.append(node["externalId"])
+            if isinstance(node.get("channelId"), str):
+                self.channel_ids.append(node["channelId"])
             for v in node.values():
-                walk(v)
+                self._visit(v)
         elif isinstance(node, list):
             for item in node:
-                walk(item)
+                self._visit(item)
+        elif isinstance(node, str):
+            self.strings.append(node)
+
+    def first_channel_id(self) -> Optional[str]:
+        """Return the first UC id, preferring externalId over channelId."""
+        for value in self.external_ids + self.channel_ids:
+            if value.startswith("UC"):
+                return value
+        return None
+
+    def text(self) -> str:
+        """All string values joined, for free-text scans such as email detection."""
+        return " ".join(self.strings)
+
+
+def extract_links_from_json(data: Any) -> List[str]:
+    """Collect URL-like strings from ytInitialData."""
+    return PageIndex(data).links
+
+
+class HtmlFields:
+    """The few things parse_about_page reads from the raw HTML."""
+
+    __slots__ = ("og_title", "description", "hrefs", "text")
+
+    def __init__(
+        self,
+        og_title: str = "",
+        description: str = "",
+        hrefs: Optional[List[str]] = None,
+        text: str = "",
+    ) -> None:
+        self.og_title = og_title
+        self.description = description
+        self.hrefs = hrefs if hrefs is not None else []
+        self.text = text
+
+
+class _LiteHtmlExtractor(HTMLParser):
+    """Streaming tokenizer that collects meta tags, anchors and visible text without a DOM."""
+
+    # Same elements whose strings BeautifulSoup leaves out of get_text().
+    _SKIP_TEXT = {"script", "style", "template"}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.og_title: Optional[str] = None
+        self.description: Optional[str] = None
+        self.hrefs: List[str] = []
+        self.chunks: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: List[Any]) -> None:
+        if tag == "meta":
+            attr_map = dict(attrs)
+            if self.og_title is None and attr_map.get("property") == "og:title":
+                self.og_title = attr_map.get("content") or ""
+            if self.description is None and attr_map.get("name") == "description":
+                self.description = attr_map.get("content") or ""
+        elif tag == "a":
+            for key, value in attrs:
+                if key == "href":
+                    self.hrefs.append(value or "")
+                    break
+        elif tag in self._SKIP_TEXT:
+            self._skip_depth += 1
+
+    def handle_startendtag(self, tag: str, attrs: List[Any]) -> None:
+        if tag not in self._SKIP_TEXT:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._SKIP_TEXT and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            data = data.strip()
+            if data:
+                self.chunks.append(data)
+
+    def unknown_decl(self, data: str) -> None:
+        if data.startswith("CDATA["):
+            self.handle_data(data[len("CDATA["):])
+
+
+def _html_fields_lite(html: str) -> HtmlFields:
+    parser = _LiteHtmlExtractor()
+    parser.feed(html)
+    parser.close()
+    return HtmlFields(parser.og_title or "", parser.description or "", parser.hrefs, " ".join(parser.chunks))
+
+
+def _html_fields_bs4(html: str) -> HtmlFields:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    title_meta = soup.find("meta", {"property": "og:title"})
+    desc_meta = soup.find("meta", {"name": "description"})
+    return HtmlFields(
+        title_meta.get("content", "") if title_meta else "",
+        desc_meta.get("content", "") if desc_meta else "",
+        [a["href"] for a in soup.find_all("a", href=True)],
+        soup.get_text(" ", strip=True),
+    )
+
 
-    walk(data)
-    return links
+def extract_html_fields(html: str, backend: Optional[str] = None) -> HtmlFields:
+    """Pull og:title, meta description, anchors and page text using the configured backend."""
+    if (backend or HTML_BACKEND) == "bs4":
+        return _html_fields_bs4(html)
+    return _html_fields_lite(html)
 
 
-def extract_external_links(soup: BeautifulSoup, data: Optional[Dict[str, Any]]) -> Dict[str, str]:
+def extract_external_links(
+    hrefs: List[str],
+    data: Optional[Dict[str, Any]],
+    index: Optional[PageIndex] = None,
+) -> Dict[str, str]:
     """Return first Telegram/Website/social links from both HTML and JSON."""
     telegram_link = ""
     website_link = ""
@@ -370,11 +1684,9 @@ def extract_external_links(soup: BeautifulSoup, data: Optional[Dict[str, Any]])
     vk_link = ""
     facebook_link = ""
 
-    link_candidates: List[str] = []
-    for a in soup.find_all("a", href=True):
-        link_candidates.append(a["href"])
+    link_candidates: List[str] = list(hrefs)
     if isinstance(data, dict):
-        link_candidates.extend(extract_links_from_json(data))
+        link_candidates.extend(index.links if index is not None else extract_links_from_json(data))
         meta_links = (
             data.get("metadata", {})
             .get("channelMetadataRenderer", {})
@@ -458,29 +1770,152 @@ def extract_external_links(soup: BeautifulSoup, data: Optional[Dict[str, Any]])
     }
 
 
+class PageDocument:
+    """A fetched page with its ytInitialData and PageIndex decoded on first use."""
+
+    __slots__ = ("url", "html", "_data", "_index", "_decoded")
+
+    def __init__(self, url: str, html: str) -> None:
+        self.url = url
+        self.html = html
+        self._data: Optional[Dict[str, Any]] = None
+        self._index: Optional[PageIndex] = None
+        self._decoded = False
+
+    @property
+    def data(self) -> Optional[Dict[str, Any]]:
+        if not self._decoded:
+            self._data = extract_ytinitialdata(self.html)
+            self._decoded = True
+        return self._data
+
+    @property
+    def index(self) -> PageIndex:
+        if self._index is None:
+            data = self.data
+            self._index = PageIndex(data) if isinstance(data, dict) else PageIndex()
+        return self._index
+
+
+class PageMemo:
+    """Per-run LRU memo of fetched pages, shared by every consumer of the same URL."""
+
+    def __init__(self, max_pages: int) -> None:
+        self.max_pages = max_pages
+        self._pages: "OrderedDict[str, Tuple[Optional[PageDocument], bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[PageDocument]:
+        """Return the page for url, fetching it only if this run hasn't already."""
+        return self.get_with_status(url)[0]
+
+    def get_with_status(self, url: str) -> Tuple[Optional[PageDocument], bool]:
+        """The page for url, and for a missing page whether the server said it is gone."""
+        with self._lock:
+            if url in self._pages:
+                self._pages.move_to_end(url)
+                return self._pages[url]
+        html, gone = fetch_html_status(url)
+        entry = (PageDocument(url, html) if html else None, gone)
+        with self._lock:
+            self._pages[url] = entry
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return entry
+
+
+_PAGE_MEMO = PageMemo(PAGE_MEMO_SIZE)
+
+
+def fetch_page(url: str) -> Optional[PageDocument]:
+    """Fetch a page through the per-run memo."""
+    return _PAGE_MEMO.get(url)
+
+
+def fetch_page_status(url: str) -> Tuple[Optional[PageDocument], bool]:
+    """fetch_page, also telling whether a missing page was a 404/410."""
+    return _PAGE_MEMO.get_with_status(url)
+
+
+def channel_id_from_page(doc: PageDocument) -> Optional[str]:
+    """Find the page owner's UC channelId in ytInitialData or, failing that, the raw HTML."""
+    data = doc.data
+    meta = (
+        data.get("metadata", {}).get("channelMetadataRenderer", {})
+        if isinstance(data, dict)
+        else {}
+    )
+    if isinstance(meta, dict):
+        ext_id = meta.get("externalId")
+        if isinstance(ext_id, str) and ext_id.startswith("UC"):
+            return ext_id
+        chan_url = meta.get("channelUrl")
+        if isinstance(chan_url, str):
+            m = re.search(r"/channel/(UC[\w-]+)", chan_url)
+            if m:
+                return m.group(1)
+    if isinstance(data, dict):
+        cid = doc.index.first_channel_id()
+        if cid:
+            return cid
+
+    m = re.search(r'"externalId":"(UC[\w-]+)"', doc.html)
+    if m:
+        return m.group(1)
+    m = re.search(r'"channelId":"(UC[\w-]+)"', doc.html)
+    if m:
+        return m.group(1)
+    return None
+
+
+def empty_about_row(channel_url: str) -> Dict[str, str]:
+    """Row used when a channel's About page could not be fetched."""
+    return {
+        "Channel URL": channel_url,
+        "Name": "",
+        "Subscribers": "",
+        "Description": "",
+        "Email": "",
+        "Telegram": "",
+        "Website": "",
+        "Instagram": "",
+        "VK": "",
+        "Facebook": "",
+        "Channel ID": "",
+    }
+
+
+def about_url(channel_url: str) -> str:
+    """URL of a channel's About page."""
+    return channel_url.rstrip("/") + "/about"
+
+
 def parse_about_page(channel_url: str) -> Dict[str, str]:
-    """Parse a channel's About page to collect metadata."""
-    url = channel_url.rstrip("/") + "/about"
-    html = fetch_html(url)
-    if not html:
-        return {
-            "Channel URL": channel_url,
-            "Name": "",
-            "Subscribers": "",
-            "Description": "",
-            "Email": "",
-            "Telegram": "",
-            "Website": "",
-            "Instagram": "",
-            "VK": "",
-            "Facebook": "",
-        }
+    """Parse a channel's About page to collect metadata (including its UC id as 'Channel ID')."""
+    doc = fetch_page(about_url(channel_url))
+    if doc is None:
+        return empty_about_row(channel_url)
+    return parse_about_document(channel_url, doc)
 
-    soup = BeautifulSoup(html, "html.parser")
-    data = extract_ytinitialdata(html)
 
-    title_meta = soup.find("meta", {"property": "og:title"})
-    name = title_meta.get("content", "") if title_meta else ""
+def parse_about_html(channel_url: str, html: str, backend: Optional[str] = None) -> Dict[str, str]:
+    """Build an output row from a fetched About page."""
+    return parse_about_document(channel_url, PageDocument(about_url(channel_url), html), backend)
+
+
+def parse_about_document(channel_url: str, doc: PageDocument, backend: Optional[str] = None) -> Dict[str, str]:
+    """Build an output row from a fetched About page document."""
+    with metrics().timed("parse_about_page_seconds"):
+        return _parse_about_document(channel_url, doc, backend)
+
+
+def _parse_about_document(channel_url: str, doc: PageDocument, backend: Optional[str]) -> Dict[str, str]:
+    html = doc.html
+    fields = extract_html_fields(html, backend)
+    data = doc.data
+    index = doc.index
+
+    name = fields.og_title
     if not name and isinstance(data, dict):
         name = (
             data.get("metadata", {})
@@ -492,8 +1927,7 @@ def parse_about_page(channel_url: str) -> Dict[str, str]:
             .get("title", "")
         )
 
-    desc_meta = soup.find("meta", {"name": "description"})
-    description = desc_meta.get("content", "") if desc_meta else ""
+    description = fields.description
     if not description and isinstance(data, dict):
         description = (
             data.get("metadata", {})
@@ -529,7 +1963,7 @@ def parse_about_page(channel_url: str) -> Dict[str, str]:
         ):
             if cand:
                 subs_candidates.append(cand)
-        subs_candidates.extend(list(walk_for_key(data, "subscriberCountText")))
+        subs_candidates.extend(index.subscriber_texts)
         for cand in subs_candidates:
             subs_text = cand if isinstance(cand, str) else text_from_runs(cand)
             if subs_text:
@@ -539,12 +1973,12 @@ def parse_about_page(channel_url: str) -> Dict[str, str]:
     combined_text = " ".join(
         [
             description or "",
-            soup.get_text(" ", strip=True),
-            json.dumps(data, ensure_ascii=False) if isinstance(data, dict) else "",
+            fields.text,
+            index.text(),
         ]
     )
     email = first_email_in_text(combined_text)
-    links = extract_external_links(soup, data if isinstance(data, dict) else None)
+    links = extract_external_links(fields.hrefs, data if isinstance(data, dict) else None, index)
 
     return {
         "Channel URL": channel_url,
@@ -557,234 +1991,656 @@ def parse_about_page(channel_url: str) -> Dict[str, str]:
         "Instagram": links.get("Instagram", ""),
         "VK": links.get("VK", ""),
         "Facebook": links.get("Facebook", ""),
+        "Channel ID": channel_id_from_page(doc) or "",
     }
 
 
+_PARSE_POOL: Optional[ProcessPoolExecutor] = None
+_PARSE_POOL_LOCK = threading.Lock()
+
+
+def parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the shared About-page parsing process pool, or None when PARSE_WORKERS is 0."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _PARSE_POOL
+    if PARSE_WORKERS <= 0:
+        return None
+    with _PARSE_POOL_LOCK:
+        if _PARSE_POOL is None:
+            # The pool starts while fetching threads hold locks; forked children would inherit them held.
+            _PARSE_POOL = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _PARSE_POOL
+
+
+def shutdown_parse_pool() -> None:
+    """Stop the parsing processes, if any were started."""
+    global _PARSE_POOL
+    with _PARSE_POOL_LOCK:
+        if _PARSE_POOL is not None:
+            _PARSE_POOL.shutdown()
+            _PARSE_POOL = None
+
+
+async def parse_about_offloaded(
+    channel_url: str, doc: Optional[PageDocument], threads: Optional[Executor] = None
+) -> Dict[str, str]:
+    """Parse a fetched About page in the process pool so JSON decoding and tree walks skip the GIL.
+
+    Only the raw HTML goes to the worker and only the compact row comes back. Without a
+    process pool the page is parsed on `threads` (the loop's default executor if None),
+    never on the event loop itself.
+    """
+    import asyncio
+
+    if doc is None:
+        return empty_about_row(channel_url)
+    loop = asyncio.get_running_loop()
+    executor = parse_pool()
+    if executor is None:
+        return await loop.run_in_executor(threads, parse_about_document, channel_url, doc)
+    row, worker_metrics = await loop.run_in_executor(
+        executor, _parse_about_in_worker, channel_url, doc.html, HTML_BACKEND
+    )
+    metrics().merge(worker_metrics)
+    return row
+
+
+def _parse_about_in_worker(channel_url: str, html: str, backend: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Process-pool entry point: the row plus the metrics recorded while parsing it."""
+    metrics().reset()
+    row = parse_about_html(channel_url, html, backend)
+    return row, metrics().state()
+
+
 # ------------------------------------------------------------
 # YouTube Data API helpers
 # ------------------------------------------------------------
 
 
+class QuotaLedger:
+    """Thread-safe tally of Data API quota units, overall, per endpoint and per channel."""
+
+    def __init__(self, daily_quota: int) -> None:
+        self.daily_quota = daily_quota
+        self.total = 0
+        self.by_endpoint: Dict[str, int] = {}
+        self.by_channel: Dict[str, int] = {}
+        self.exhausted = False
+        self._warned = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def charge_to(self, channel_url: str) -> Iterator[None]:
+        """Attribute API calls made by this thread inside the block to channel_url."""
+        previous = getattr(self._local, "channel", None)
+        self._local.channel = channel_url
+        try:
+            yield
+        finally:
+            self._local.channel = previous
+
+    def charge(self, endpoint: str) -> int:
+        """Record one call to endpoint and return its unit cost."""
+        cost = YT_API_UNIT_COSTS.get(endpoint, 1)
+        metrics().inc("api_quota_units_total", cost, endpoint=endpoint)
+        channel = getattr(self._local, "channel", None)
+        with self._lock:
+            self.total += cost
+            self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + cost
+            if channel:
+                self.by_channel[channel] = self.by_channel.get(channel, 0) + cost
+            over = self.total > self.daily_quota and not self._warned
+            if over:
+                self._warned = True
+        if over:
+            print(f"[WARN] YouTube API usage passed the daily quota of {self.daily_quota} units")
+        return cost
+
+    def mark_exhausted(self) -> None:
+        """Remember that the API refused further calls today, so the run stops making them."""
+        with self._lock:
+            first = not self.exhausted
+            self.exhausted = True
+        if first:
+            print("[WARN] YouTube API quota exhausted; skipping API calls for the rest of the run")
+
+    def channel_units(self, channel_url: str) -> int:
+        with self._lock:
+            return self.by_channel.get(channel_url, 0)
+
+    def summary(self) -> str:
+        """Totals; per-channel figures exclude batched calls, which are shared across channels."""
+        with self._lock:
+            channels = len(self.by_channel)
+            per_channel = self.total / channels if channels else 0.0
+            endpoints = ", ".join(f"{k}={v}" for k, v in sorted(self.by_endpoint.items())) or "none"
+            return (
+                f"{self.total} units ({endpoints}); {channels} channels, "
+                f"{per_channel:.1f} units/channel on average"
+            )
+
+
+_QUOTA = QuotaLedger(YT_API_DAILY_QUOTA)
+
+
+def quota_ledger() -> QuotaLedger:
+    """Return the run-wide Data API quota ledger."""
+    return _QUOTA
+
+
 def yt_api_get(endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
-    """Minimal YouTube Data API GET wrapper."""
-    if not YT_API_ENABLED:
+    """Minimal YouTube Data API GET wrapper; charges quota for calls not answered by the cache."""
+    if not YT_API_ENABLED or quota_ledger().exhausted:
         return {}
     try:
-        base = f"https://www.googleapis.com/youtube/v3/{endpoint}"
+        base = f"{YT_API_BASE}/{endpoint}"
         params = dict(params)
         params["key"] = YOUTUBE_API_KEY
-        resp = requests.get(base, params=params, timeout=15)
-        resp.raise_for_status()
-        data = resp.json()
+        with metrics().timed("yt_api_get_seconds", endpoint=endpoint):
+            text, from_cache = http_get(base, params=params, timeout=15)
+        if not from_cache:
+            quota_ledger().charge(endpoint)
+        data = json.loads(text)
         if not isinstance(data, dict):
             print(f"[WARN] YouTube API {endpoint} returned non-dict response")
             return {}
         if "error" in data:
+            metrics().inc("api_errors_total", endpoint=endpoint)
             print(f"[WARN] YouTube API {endpoint} returned error: {data.get('error')}")
         return data
+    except BlockedResponseError as exc:
+        metrics().inc("api_errors_total", endpoint=endpoint)
+        if exc.outcome == "quota":
+            quota_ledger().mark_exhausted()
+        else:
+            print(f"[WARN] YouTube API {endpoint} request failed: {exc}")
+        return {}
     except Exception as exc:
+        metrics().inc("api_errors_total", endpoint=endpoint)
         print(f"[WARN] YouTube API {endpoint} request failed: {exc}")
         return {}
 
 
-def resolve_channel_id(channel_url: str) -> Optional[str]:
-    """Resolve UC channelId from URL using API when possible, else HTML fallback."""
-    try:
-        def _items(obj: Any) -> List[Any]:
-            if not isinstance(obj, dict):
-                return []
-            val = obj.get("items", [])
-            return val if isinstance(val, list) else []
-
-        def _first_channel_id_from_items(items: List[Any]) -> Optional[str]:
-            for item in items:
-                if not isinstance(item, dict):
-                    continue
-                cid = item.get("id", {}).get("channelId") if isinstance(item.get("id"), dict) else None
-                if not cid and "channelId" in item and isinstance(item["channelId"], str):
-                    cid = item["channelId"]
-                if cid and isinstance(cid, str) and cid.startswith("UC"):
-                    return cid
+def _api_items(obj: Any) -> List[Any]:
+    if not isinstance(obj, dict):
+        return []
+    val = obj.get("items", [])
+    return val if isinstance(val, list) else []
+
+
+def resolution_key(channel_url: str) -> Optional[str]:
+    """Case-folded '@handle', 'c/name' or 'user/name' part of a channel URL, if it has one."""
+    path = unquote(urlparse(channel_url).path)
+    m = re.match(r"^/(@[^/?#]+|c/[^/?#]+|user/[^/?#]+)", path)
+    return m.group(1).lower() if m else None
+
+
+class ChannelIdCache:
+    """On-disk handle/custom/legacy URL -> UC channelId map with negative entries for dead URLs."""
+
+    def __init__(self, path: str, ttl: int, negative_ttl: int) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS channel_ids ("
+            "key TEXT PRIMARY KEY, channel_id TEXT NOT NULL, resolved_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, channel_url: str) -> Optional[str]:
+        """Cached UC id, '' for a fresh negative entry, or None when unknown or expired."""
+        key = resolution_key(channel_url)
+        if key is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT channel_id, resolved_at FROM channel_ids WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        channel_id, resolved_at = row
+        if time.time() - resolved_at > (self.ttl if channel_id else self.negative_ttl):
             return None
+        self.hits += 1
+        return channel_id
+
+    def put_many(self, resolutions: Dict[str, str]) -> None:
+        """Store URL -> UC id pairs; an empty id records the URL as unresolvable."""
+        now = time.time()
+        entries = [
+            (key, cid, now)
+            for url, cid in resolutions.items()
+            if (key := resolution_key(url)) is not None
+        ]
+        if not entries:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO channel_ids (key, channel_id, resolved_at) VALUES (?, ?, ?)",
+                entries,
+            )
+            self._conn.commit()
+
+    def put(self, channel_url: str, channel_id: str) -> None:
+        self.put_many({channel_url: channel_id})
 
-        parsed = urlparse(channel_url)
-        path = parsed.path or ""
-
-        # Step 1: explicit /channel/UC...
-        m = re.search(r"/channel/([A-Za-z0-9_-]+)", path)
-        if m and m.group(1).startswith("UC"):
-            return m.group(1)
-
-        # Step 2: handle-based via API
-        handle_match = re.search(r"/@([^/?#]+)", path)
-        if handle_match and YT_API_ENABLED:
-            handle = unquote(handle_match.group(1))
-            for candidate in (handle, f"@{handle}"):
-                data = yt_api_get(
-                    "channels",
-                    {
-                        "part": "id",
-                        "forHandle": candidate,
-                    },
+
+_ID_CACHE: Optional[ChannelIdCache] = None
+_ID_CACHE_LOCK = threading.Lock()
+
+
+def channel_id_cache() -> Optional[ChannelIdCache]:
+    """Return the shared resolution cache, or None when disabled or unavailable."""
+    global _ID_CACHE
+    if not CHANNEL_ID_CACHE_PATH:
+        return None
+    with _ID_CACHE_LOCK:
+        if _ID_CACHE is None:
+            try:
+                _ID_CACHE = ChannelIdCache(
+                    CHANNEL_ID_CACHE_PATH, CHANNEL_ID_CACHE_TTL, CHANNEL_ID_CACHE_NEGATIVE_TTL
                 )
-                cid = _first_channel_id_from_items(_items(data))
-                if cid:
-                    return cid
-
-        # Step 3: legacy /user/<name>
-        user_match = re.search(r"/user/([^/?#]+)", path)
-        if user_match and YT_API_ENABLED:
-            username = unquote(user_match.group(1))
-            data = yt_api_get(
-                "channels",
-                {
-                    "part": "id",
-                    "forUsername": username,
-                },
-            )
-            cid = _first_channel_id_from_items(_items(data))
-            if cid:
-                return cid
+            except (OSError, sqlite3.Error) as exc:
+                print(f"[WARN] channelId cache disabled ({CHANNEL_ID_CACHE_PATH}): {exc}")
+                return None
+        return _ID_CACHE
 
-        # Step 4: custom /c/<name> via search
-        custom_match = re.search(r"/c/([^/?#]+)", path)
-        if custom_match and YT_API_ENABLED:
-            query = unquote(custom_match.group(1))
-            data = yt_api_get(
-                "search",
-                {
-                    "part": "id",
-                    "type": "channel",
-                    "q": query,
-                    "maxResults": 3,
-                },
-            )
-            cid = _first_channel_id_from_items(_items(data))
-            if cid:
-                return cid
 
-        # Step 5: HTML fallback (main and about)
-        for candidate_url in (channel_url, channel_url.rstrip("/") + "/about"):
-            html = fetch_html(candidate_url)
-            if not html:
-                continue
-            data = extract_ytinitialdata(html)
-            meta = (
-                data.get("metadata", {}).get("channelMetadataRenderer", {})
-                if isinstance(data, dict)
-                else {}
-            )
-            if isinstance(meta, dict):
-                ext_id = meta.get("externalId")
-                if isinstance(ext_id, str) and ext_id.startswith("UC"):
-                    return ext_id
-                chan_url = meta.get("channelUrl")
-                if isinstance(chan_url, str):
-                    m = re.search(r"/channel/(UC[\w-]+)", chan_url)
-                    if m:
-                        return m.group(1)
-            if isinstance(data, dict):
-                for value in walk_for_key(data, "externalId"):
-                    if isinstance(value, str) and value.startswith("UC"):
-                        return value
-                for value in walk_for_key(data, "channelId"):
-                    if isinstance(value, str) and value.startswith("UC"):
-                        return value
-
-            m = re.search(r'"externalId":"(UC[\w-]+)"', html)
-            if m:
-                return m.group(1)
-            m = re.search(r'"channelId":"(UC[\w-]+)"', html)
-            if m:
-                return m.group(1)
+def remember_channel_ids(resolutions: Dict[str, str]) -> None:
+    """Record URL -> UC id pairs learned for free (search results, About pages)."""
+    cache = channel_id_cache()
+    if cache is not None:
+        cache.put_many({url: cid for url, cid in resolutions.items() if cid.startswith("UC")})
+
+
+def resolve_channel_id(channel_url: str) -> Optional[str]:
+    """Resolve UC channelId from URL using API when possible, else HTML fallback.
+
+    The persistent resolution cache is consulted before any API or HTML work; URLs that
+    could not be resolved are cached negatively for a shorter time.
+    """
+    explicit = re.search(r"/channel/(UC[A-Za-z0-9_-]+)", urlparse(channel_url).path)
+    if explicit:
+        return explicit.group(1)
+    cache = channel_id_cache()
+    cached = cache.get(channel_url) if cache is not None else None
+    if cached is not None:
+        if not cached:
+            print(f"[WARN] No channelId for {channel_url} (cached), cannot get 30-day views.")
+        return cached or None
 
+    try:
+        channel_id, conclusive = _resolve_channel_id_uncached(channel_url)
     except Exception as exc:
         print(f"[WARN] Could not resolve channelId for {channel_url}: {exc}")
         return None
+    if cache is not None and (channel_id or conclusive):
+        cache.put(channel_url, channel_id or "")
+    if not channel_id:
+        print(f"[WARN] No channelId for {channel_url}, cannot get 30-day views.")
+    return channel_id
 
-    print(f"[WARN] No channelId for {channel_url}, cannot get 30-day views.")
-    return None
 
+def _resolve_channel_id_uncached(channel_url: str) -> Tuple[Optional[str], bool]:
+    """API lookups and HTML fallback behind resolve_channel_id; may raise.
+
+    Returns the UC id (or None) and whether a None is conclusive, i.e. every lookup that
+    was tried got an answer (a 404/410 page counts); failed or skipped API calls and pages
+    that could not be fetched for other reasons don't.
+    """
+    conclusive = True
 
-def get_views_last_30_days_api(channel_url: str) -> str:
-    """Fetch 30-day views via YouTube Data API; return '' on failure."""
+    def _answered(data: Dict[str, Any]) -> bool:
+        nonlocal conclusive
+        if not data or "error" in data:
+            conclusive = False
+            return False
+        return True
+
+    def _first_channel_id_from_items(items: List[Any]) -> Optional[str]:
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            raw_id = item.get("id")
+            # search.list nests the id ({"channelId": ...}); channels.list returns it as a string.
+            cid = raw_id.get("channelId") if isinstance(raw_id, dict) else raw_id
+            if not cid and "channelId" in item and isinstance(item["channelId"], str):
+                cid = item["channelId"]
+            if cid and isinstance(cid, str) and cid.startswith("UC"):
+                return cid
+        return None
+
+    parsed = urlparse(channel_url)
+    path = parsed.path or ""
+
+    # Step 1: explicit /channel/UC...
+    m = re.search(r"/channel/([A-Za-z0-9_-]+)", path)
+    if m and m.group(1).startswith("UC"):
+        return m.group(1), True
+
+    # Step 2: handle-based via API (forHandle accepts the handle with or without '@')
+    handle_match = re.search(r"/@([^/?#]+)", path)
+    if handle_match and YT_API_ENABLED:
+        handle = unquote(handle_match.group(1))
+        data = yt_api_get(
+            "channels",
+            {
+                "part": "id",
+                "forHandle": handle,
+            },
+        )
+        cid = _first_channel_id_from_items(_api_items(data)) if _answered(data) else None
+        if cid:
+            return cid, True
+
+    # Step 3: legacy /user/<name>
+    user_match = re.search(r"/user/([^/?#]+)", path)
+    if user_match and YT_API_ENABLED:
+        username = unquote(user_match.group(1))
+        data = yt_api_get(
+            "channels",
+            {
+                "part": "id",
+                "forUsername": username,
+            },
+        )
+        cid = _first_channel_id_from_items(_api_items(data)) if _answered(data) else None
+        if cid:
+            return cid, True
+
+    # Step 4: HTML fallback (about, then main), reusing pages this run already fetched
+    for candidate_url in (channel_url.rstrip("/") + "/about", channel_url):
+        doc, gone = fetch_page_status(candidate_url)
+        if doc is None:
+            conclusive = conclusive and gone
+            continue
+        cid = channel_id_from_page(doc)
+        if cid:
+            return cid, True
+
+    # Step 5: custom /c/<name> via search (100 units, so only after the free HTML fallback)
+    custom_match = re.search(r"/c/([^/?#]+)", path)
+    if custom_match and YT_API_ENABLED:
+        query = unquote(custom_match.group(1))
+        data = yt_api_get(
+            "search",
+            {
+                "part": "id",
+                "type": "channel",
+                "q": query,
+                "maxResults": 3,
+            },
+        )
+        cid = _first_channel_id_from_items(_api_items(data)) if _answered(data) else None
+        if cid:
+            return cid, True
+
+    return None, conclusive
+
+
+class ApiBatcher:
+    """Coalesces single-id lookups from many threads into list calls of up to 50 ids.
+
+    Each caller blocks until the batch holding its id has been fetched; the thread that
+    fills a batch sends it, and so does a caller that finds every thread recently using the
+    batcher already waiting (nobody is left to add ids, e.g. a single serial worker).
+    Otherwise a timer sends whatever is pending after max_wait.
+    """
+
+    MAX_IDS = 50
+    # Threads that used the batcher within this many seconds count as peers who may add ids.
+    PEER_WINDOW = 2.0
+
+    def __init__(self, endpoint: str, part: str, max_wait: float, remember: bool = False) -> None:
+        self.endpoint = endpoint
+        self.part = part
+        self.max_wait = max_wait
+        self.remember = remember
+        self.calls = 0
+        self._pending: Dict[str, "Future[Optional[Dict[str, Any]]]"] = {}
+        self._results: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._peers: Dict[int, float] = {}
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Return the API resource for item_id, or None if the API did not return it."""
+        return self.get_many([item_id]).get(item_id)
+
+    def get_many(self, item_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            self._peers[threading.get_ident()] = time.monotonic()
+        futures = {item_id: self._submit(item_id) for item_id in item_ids}
+        batch = None
+        with self._lock:
+            self._waiting += 1
+            if self._pending and self._waiting >= self._active_peers_locked():
+                batch = self._take_locked()
+        try:
+            if batch:
+                self._send(batch)
+            results = {item_id: fut.result() for item_id, fut in futures.items()}
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        return {item_id: item for item_id, item in results.items() if item is not None}
+
+    def _active_peers_locked(self) -> int:
+        cutoff = time.monotonic() - self.PEER_WINDOW
+        for ident in [i for i, seen in self._peers.items() if seen < cutoff]:
+            del self._peers[ident]
+        return len(self._peers)
+
+    def _submit(self, item_id: str) -> "Future[Optional[Dict[str, Any]]]":
+        batch = None
+        with self._lock:
+            if item_id in self._results:
+                done: "Future[Optional[Dict[str, Any]]]" = Future()
+                done.set_result(self._results[item_id])
+                return done
+            fut = self._pending.get(item_id)
+            if fut is None:
+                fut = Future()
+                self._pending[item_id] = fut
+            if len(self._pending) >= self.MAX_IDS:
+                batch = self._take_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_wait, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch:
+            self._send(batch)
+        return fut
+
+    def _take_locked(self) -> Dict[str, "Future[Optional[Dict[str, Any]]]"]:
+        batch = self._pending
+        self._pending = {}
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _flush(self) -> None:
+        with self._lock:
+            batch = self._take_locked()
+        if batch:
+            self._send(batch)
+
+    def _send(self, batch: Dict[str, "Future[Optional[Dict[str, Any]]]"]) -> None:
+        found: Dict[str, Dict[str, Any]] = {}
+        answered: List[str] = []
+        ids = list(batch)
+        try:
+            # Shared by every channel in the batch, so counted in the quota totals only.
+            with quota_ledger().charge_to(""):
+                for i in range(0, len(ids), self.MAX_IDS):
+                    chunk = ids[i : i + self.MAX_IDS]
+                    data = yt_api_get(
+                        self.endpoint,
+                        {"part": self.part, "id": ",".join(chunk), "maxResults": self.MAX_IDS},
+                    )
+                    with self._lock:
+                        self.calls += 1
+                    if data and "error" not in data:
+                        answered.extend(chunk)
+                    for item in _api_items(data):
+                        if isinstance(item, dict) and isinstance(item.get("id"), str):
+                            found[item["id"]] = item
+        finally:
+            # Only ids the API actually answered for; a failed call is retried by the next lookup.
+            if self.remember:
+                with self._lock:
+                    for item_id in answered:
+                        self._results[item_id] = found.get(item_id)
+            for item_id, fut in batch.items():
+                fut.set_result(found.get(item_id))
+
+
+_CHANNEL_BATCHER = ApiBatcher("channels", "contentDetails,statistics", YT_API_BATCH_WAIT, remember=True)
+_VIDEO_BATCHER = ApiBatcher("videos", "statistics", YT_API_BATCH_WAIT)
+
+
+def report_api_usage() -> None:
+    """Print the run's Data API quota use, the batched list calls that served it and the lookups cached ids saved."""
     if not YT_API_ENABLED:
-        return ""
-    channel_id = resolve_channel_id(channel_url)
-    if not channel_id:
-        return ""
+        return
+    print(f"[INFO] YouTube API quota used: {quota_ledger().summary()}")
+    print(
+        f"[INFO] Batched API calls: channels.list={_CHANNEL_BATCHER.calls}, "
+        f"videos.list={_VIDEO_BATCHER.calls}"
+    )
+    id_cache = channel_id_cache()
+    if id_cache is not None:
+        print(f"[INFO] channelId cache hits: {id_cache.hits}")
+
+
+def api_channel(channel_id: str) -> Optional[Dict[str, Any]]:
+    """channels.list resource (contentDetails + statistics) for a channel, fetched in shared batches."""
+    return _CHANNEL_BATCHER.get(channel_id)
+
 
-    def _items(obj: Any) -> List[Any]:
-        if not isinstance(obj, dict):
-            return []
-        val = obj.get("items", [])
-        return val if isinstance(val, list) else []
+def api_channel_counts(channel_id: Optional[str]) -> Dict[str, str]:
+    """Exact subscriber and lifetime view counts from the Data API ('' when unavailable)."""
+    counts = {"Subscriber Count": "", "Total Views": ""}
+    item = api_channel(channel_id) if channel_id and YT_API_ENABLED else None
+    stats = item.get("statistics", {}) if isinstance(item, dict) else {}
+    if isinstance(stats, dict):
+        if not stats.get("hiddenSubscriberCount") and str(stats.get("subscriberCount", "")).isdigit():
+            counts["Subscriber Count"] = str(stats["subscriberCount"])
+        if str(stats.get("viewCount", "")).isdigit():
+            counts["Total Views"] = str(stats["viewCount"])
+    return counts
 
-    published_after = (datetime.now(timezone.utc) - timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%SZ")
 
+def uploads_playlist_id(channel_id: str) -> Optional[str]:
+    """Return the channel's uploads playlist id via the batched channels.list lookup."""
+    item = api_channel(channel_id)
+    if not isinstance(item, dict):
+        return None
+    playlist = item.get("contentDetails", {}).get("relatedPlaylists", {}).get("uploads")
+    if isinstance(playlist, str) and playlist:
+        return playlist
+    return None
+
+
+def recent_upload_ids(playlist_id: str, published_after: datetime, max_videos: int) -> List[str]:
+    """Page the uploads playlist (1 unit per page, newest first) until videos predate the cutoff."""
     video_ids: List[str] = []
     page_token = None
-    attempts = 0
-    while attempts < 3:
-        params = {
-            "part": "id",
-            "channelId": channel_id,
-            "publishedAfter": published_after,
-            "type": "video",
-            "order": "date",
+    while len(video_ids) < max_videos:
+        params: Dict[str, Any] = {
+            "part": "contentDetails",
+            "playlistId": playlist_id,
             "maxResults": 50,
         }
         if page_token:
             params["pageToken"] = page_token
-        data = yt_api_get("search", params)
-        if not isinstance(data, dict):
-            break
-        items = _items(data)
-        for item in items:
+        data = yt_api_get("playlistItems", params)
+        reached_cutoff = False
+        for item in _api_items(data):
             if not isinstance(item, dict):
                 continue
-            vid = item.get("id", {}).get("videoId")
-            if vid:
-                video_ids.append(vid)
-        page_token = data.get("nextPageToken")
-        attempts += 1
-        if not page_token or len(video_ids) >= 100:
+            details = item.get("contentDetails", {})
+            vid = details.get("videoId")
+            published = details.get("videoPublishedAt")
+            if not vid or not isinstance(published, str):
+                continue
+            try:
+                published_at = datetime.strptime(published, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
+            if published_at < published_after:
+                reached_cutoff = True
+                break
+            video_ids.append(vid)
+        page_token = data.get("nextPageToken") if isinstance(data, dict) else None
+        if reached_cutoff or not page_token:
             break
+    return video_ids[:max_videos]
 
-    if not video_ids:
-        print(f"[INFO] No recent videos (30d) for {channel_url}")
-        return ""
 
+def sum_video_views(video_ids: List[str]) -> int:
+    """Total viewCount for videos, fetched through batched videos.list calls shared across channels."""
     total_views = 0
-    for i in range(0, len(video_ids), 50):
-        batch = video_ids[i : i + 50]
-        stats = yt_api_get(
-            "videos",
-            {
-                "part": "statistics",
-                "id": ",".join(batch),
-            },
-        )
-        if not isinstance(stats, dict):
-            continue
-        for item in _items(stats):
-            if not isinstance(item, dict):
+    for item in _VIDEO_BATCHER.get_many(video_ids).values():
+        vc = item.get("statistics", {}).get("viewCount")
+        if vc:
+            try:
+                total_views += int(vc)
+            except ValueError:
                 continue
-            vc = item.get("statistics", {}).get("viewCount")
-            if vc:
-                try:
-                    total_views += int(vc)
-                except ValueError:
-                    continue
+    return total_views
+
 
+def get_views_last_30_days_api(channel_url: str, channel_id: Optional[str] = None, max_videos: int = 120) -> str:
+    """Fetch 30-day views via YouTube Data API; return '' on failure.
+
+    Uses the cheapest path: channels.list for the uploads playlist, playlistItems.list
+    down to the 30-day cutoff and videos.list statistics, all at 1 unit per call instead
+    of 100 per search.list page. channels.list and videos.list are batched across channels.
+    """
+    if not YT_API_ENABLED:
+        return ""
+    channel_id = channel_id or resolve_channel_id(channel_url)
+    if not channel_id:
+        return ""
+
+    playlist_id = uploads_playlist_id(channel_id)
+    if not playlist_id:
+        print(f"[WARN] No uploads playlist for {channel_url}")
+        return ""
+
+    published_after = datetime.now(timezone.utc) - timedelta(days=30)
+    video_ids = recent_upload_ids(playlist_id, published_after, max_videos)
+    if not video_ids:
+        print(f"[INFO] No recent videos (30d) for {channel_url}")
+        return ""
+
+    total_views = sum_video_views(video_ids)
     return str(total_views) if total_views > 0 else ""
 
 
-def views_last_30_days(channel_url: str, max_videos: int = 120) -> str:
-    """Return total views for last ~30 days (API only)."""
+def views_last_30_days(channel_url: str, max_videos: int = 120, channel_id: Optional[str] = None) -> str:
+    """Return total views for last ~30 days (API only); a known channel_id skips resolution."""
     if not YT_API_ENABLED:
         return ""
-    return get_views_last_30_days_api(channel_url)
+    with quota_ledger().charge_to(channel_url):
+        views = get_views_last_30_days_api(channel_url, channel_id, max_videos)
+    print(f"[QUOTA] {channel_url}: {quota_ledger().channel_units(channel_url)} API units")
+    return views
 
 
 # ------------------------------------------------------------
@@ -816,25 +2672,7 @@ def is_within_30_days(published_text: str) -> bool:
 
 def parse_view_count(view_text: str) -> Optional[int]:
     """Parse a view count text into an integer, handling тыс/млн."""
-    if not view_text:
-        return None
-    text = view_text.replace("\xa0", " ").lower().strip()
-    for word in ["просмотров", "просмотра", "просмотры", "просмотр", "views", "view", "қаралым"]:
-        text = text.replace(word, "")
-    m = re.search(r"([\d\s.,]+)", text)
-    if not m:
-        return None
-    num_str = m.group(1).replace(" ", "").replace(",", ".")
-    multiplier = 1
-    if re.search(r"(млн|million|mln|\bm\b|\bм\b)", text):
-        multiplier = 1_000_000
-    elif re.search(r"(тыс|тысяч|\bk\b|\bк\b|мың)", text):
-        multiplier = 1_000
-    try:
-        value = float(num_str) if "." in num_str else int(num_str)
-        return int(value * multiplier)
-    except ValueError:
-        return None
+    return count_from_text(view_text)
 
 
 # ------------------------------------------------------------
@@ -876,77 +2714,1237 @@ def iter_video_renderers(data: Any) -> Iterable[Dict[str, Any]]:
             yield from iter_video_renderers(item)
 
 
+# ------------------------------------------------------------
+# Channel store (delta mode)
+# ------------------------------------------------------------
+
+
+class ChannelStore:
+    """Last-seen row per channel with a refresh timestamp for every field group in FRESHNESS_POLICY."""
+
+    def __init__(self, path: str) -> None:
+        self.run_started = time.time()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS channels (
+                url TEXT PRIMARY KEY,
+                channel_id TEXT NOT NULL DEFAULT '',
+                row TEXT NOT NULL,
+                refreshed TEXT NOT NULL,
+                first_seen REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def channels(self) -> Dict[str, str]:
+        """Every stored channel as URL -> channelId."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT url, channel_id FROM channels"))
+
+    def load(self, channel_url: str) -> Optional[Tuple[Dict[str, str], Dict[str, float]]]:
+        """Stored row and per-group refresh times, or None for a channel never seen."""
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT row, refreshed FROM channels WHERE url = ?", (channel_url,)
+            ).fetchone()
+        if found is None:
+            return None
+        return json.loads(found[0]), json.loads(found[1])
+
+    def stale_groups(self, channel_url: str, now: Optional[float] = None) -> Set[str]:
+        """Field groups whose freshness window has passed (all of them for unknown channels)."""
+        stored = self.load(channel_url)
+        if stored is None:
+            return set(FRESHNESS_POLICY)
+        now = self.run_started if now is None else now
+        refreshed = stored[1]
+        return {
+            g for g, ttl in FRESHNESS_POLICY.items() if now - refreshed.get(g, 0.0) > ttl - FRESHNESS_SLACK
+        }
+
+    def save(self, channel_url: str, row: Dict[str, str], groups: Iterable[str]) -> None:
+        """Store the row and stamp the refreshed field groups with this run's start time.
+
+        Stamping the start rather than the finish keeps a nightly run's fields exactly a
+        day old at the next night's check, however long into the run they were fetched.
+        """
+        now = time.time()
+        stored = self.load(channel_url)
+        refreshed = stored[1] if stored is not None else {}
+        for group in groups:
+            refreshed[group] = self.run_started
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO channels (url, channel_id, row, refreshed, first_seen) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET channel_id = excluded.channel_id, row = excluded.row, "
+                "refreshed = excluded.refreshed",
+                (
+                    channel_url,
+                    row.get("Channel ID", ""),
+                    json.dumps(row, ensure_ascii=False),
+                    json.dumps(refreshed),
+                    now,
+                ),
+            )
+            self._conn.commit()
+
+
+def needs_about_page(stale: Set[str]) -> bool:
+    """Whether refreshing these groups requires the About page (subscribers can come from the API)."""
+    return "about" in stale or ("subscribers" in stale and not YT_API_ENABLED)
+
+
+# ------------------------------------------------------------
+# Run journal
+# ------------------------------------------------------------
+
+
+class RunJournal:
+    """Durable SQLite journal of finished queries, discovered channels and finished rows."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS queries (
+                query TEXT PRIMARY KEY,
+                found INTEGER NOT NULL,
+                done_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS channels (
+                url TEXT PRIMARY KEY,
+                channel_id TEXT NOT NULL DEFAULT '',
+                status TEXT NOT NULL DEFAULT 'pending',
+                row TEXT,
+                error TEXT NOT NULL DEFAULT '',
+                updated_at REAL NOT NULL
+            );
+            """
+        )
+        columns = {r[1] for r in self._conn.execute("PRAGMA table_info(channels)")}
+        if "channel_id" not in columns:
+            self._conn.execute("ALTER TABLE channels ADD COLUMN channel_id TEXT NOT NULL DEFAULT ''")
+        self._conn.commit()
+
+    def reset(self) -> None:
+        """Forget everything from previous runs."""
+        with self._lock:
+            self._conn.execute("DELETE FROM queries")
+            self._conn.execute("DELETE FROM channels")
+            self._conn.commit()
+
+    def done_queries(self) -> Set[str]:
+        with self._lock:
+            return {r[0] for r in self._conn.execute("SELECT query FROM queries")}
+
+    def record_query(self, query: str, new_channels: Dict[str, str], found: int) -> None:
+        """Commit a finished query together with the new channels (URL -> channelId) it discovered."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO channels (url, channel_id, status, updated_at) VALUES (?, ?, 'pending', ?)",
+                [(url, cid, now) for url, cid in new_channels.items()],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries (query, found, done_at) VALUES (?, ?, ?)",
+                (query, found, now),
+            )
+            self._conn.commit()
+
+    def channels(self) -> Dict[str, str]:
+        """Every journaled channel as URL -> channelId ('' if unknown)."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT url, channel_id FROM channels"))
+
+    def done_channels(self) -> Set[str]:
+        with self._lock:
+            return {r[0] for r in self._conn.execute("SELECT url FROM channels WHERE status = 'done'")}
+
+    def record_row(self, url: str, row: Dict[str, str], ok: bool = True) -> None:
+        """Commit a channel's row; rows from failed fetches are kept but re-queued on resume."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO channels (url, status, row, error, updated_at) VALUES (?, ?, ?, '', ?) "
+                "ON CONFLICT(url) DO UPDATE SET status = excluded.status, row = excluded.row, "
+                "error = '', updated_at = excluded.updated_at",
+                (url, "done" if ok else "failed", json.dumps(row, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def record_failure(self, url: str, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO channels (url, status, row, error, updated_at) VALUES (?, 'failed', NULL, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET status = 'failed', row = NULL, "
+                "error = excluded.error, updated_at = excluded.updated_at",
+                (url, error, time.time()),
+            )
+            self._conn.commit()
+
+    def iter_rows(self, done_only: bool = False, batch_size: int = 500) -> Iterable[Dict[str, str]]:
+        """Stream stored rows ordered by channel URL without loading them all at once."""
+        where = "status = 'done'" if done_only else "row IS NOT NULL"
+        last_url = ""
+        while True:
+            with self._lock:
+                batch = self._conn.execute(
+                    f"SELECT url, row FROM channels WHERE {where} AND url > ? ORDER BY url LIMIT ?",
+                    (last_url, batch_size),
+                ).fetchall()
+            if not batch:
+                return
+            for url, row in batch:
+                yield json.loads(row)
+            last_url = batch[-1][0]
+
+
+# ------------------------------------------------------------
+# Query yield statistics
+# ------------------------------------------------------------
+
+
+class QueryStats:
+    """Marginal yield of every search query across runs: how many channels it added that earlier queries had not."""
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS queries (
+                query TEXT PRIMARY KEY,
+                runs INTEGER NOT NULL DEFAULT 0,
+                found INTEGER NOT NULL DEFAULT 0,
+                new INTEGER NOT NULL DEFAULT 0,
+                yield REAL NOT NULL DEFAULT 0,
+                zero_streak INTEGER NOT NULL DEFAULT 0,
+                skipped INTEGER NOT NULL DEFAULT 0,
+                last_run REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.commit()
+
+    def record(self, query: str, found: int, new: int) -> None:
+        """Fold one run of a query into its history."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO queries (query, runs, found, new, yield, zero_streak, skipped, last_run) "
+                "VALUES (?, 1, ?, ?, ?, ?, 0, ?) "
+                "ON CONFLICT(query) DO UPDATE SET runs = runs + 1, found = found + excluded.found, "
+                "new = new + excluded.new, yield = ? * excluded.new + ? * yield, "
+                "zero_streak = CASE WHEN excluded.new > 0 THEN 0 ELSE zero_streak + 1 END, "
+                "skipped = 0, last_run = excluded.last_run",
+                (
+                    query,
+                    found,
+                    new,
+                    float(new),
+                    0 if new else 1,
+                    time.time(),
+                    QUERY_YIELD_ALPHA,
+                    1 - QUERY_YIELD_ALPHA,
+                ),
+            )
+            self._conn.commit()
+
+    def schedule(self, queries: List[str]) -> List[str]:
+        """Queries to run, best first: never-run queries, then by smoothed yield; long-barren ones are skipped."""
+        with self._lock:
+            history = {
+                row[0]: row[1:]
+                for row in self._conn.execute("SELECT query, yield, zero_streak, skipped FROM queries")
+            }
+        ordered: List[Tuple[float, int, str]] = []
+        skipped: List[str] = []
+        for position, query in enumerate(queries):
+            if query not in history:
+                ordered.append((float("inf"), position, query))
+                continue
+            yield_, zero_streak, times_skipped = history[query]
+            if zero_streak >= QUERY_SKIP_AFTER and times_skipped < QUERY_RETRY_AFTER:
+                skipped.append(query)
+            else:
+                ordered.append((yield_, position, query))
+        if skipped:
+            with self._lock:
+                self._conn.executemany(
+                    "UPDATE queries SET skipped = skipped + 1 WHERE query = ?", [(q,) for q in skipped]
+                )
+                self._conn.commit()
+            metrics().inc("search_queries_skipped_total", len(skipped), reason="low_yield")
+            print(
+                f"[INFO] Skipping {len(skipped)} queries with no new channels in their last "
+                f"{QUERY_SKIP_AFTER}+ runs"
+            )
+        ordered.sort(key=lambda item: (-item[0], item[1]))
+        return [query for _, _, query in ordered]
+
+
+class YieldWindow:
+    """Tells discovery to stop once the last `size` finished queries all added nothing new."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._barren = 0
+        self._lock = threading.Lock()
+        self.exhausted = False
+
+    def add(self, new: int) -> None:
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._barren = 0 if new else self._barren + 1
+            if self._barren >= self.size and not self.exhausted:
+                self.exhausted = True
+                print(f"[INFO] Last {self.size} queries found no new channels; stopping discovery")
+
+
 # ------------------------------------------------------------
 # Pipeline
 # ------------------------------------------------------------
 
 
-def collect_all_channels() -> Set[str]:
-    """Run searches across all queries and return deduplicated channel URLs."""
-    all_channels: Set[str] = set()
-    for query in SEARCH_QUERIES:
-        print(f"\n=== Searching for query: {query!r} ===")
-        found = search_channels(query)
-        before = len(all_channels)
-        all_channels.update(found)
-        after = len(all_channels)
-        print(f"[INFO] Total unique channels so far: {after} (+{after - before})")
-    return all_channels
-
-
-def process_channels(channels: Set[str]) -> List[Dict[str, str]]:
-    """Fetch metadata for each channel and prepare rows for export."""
-    rows: List[Dict[str, str]] = []
-    total = len(channels)
-    for idx, channel_url in enumerate(sorted(channels), start=1):
+def discover_query(
+    query: str,
+    identity: ChannelIdentityIndex,
+    seen: SharedSeen,
+    journal: Optional[RunJournal] = None,
+    stats: Optional[QueryStats] = None,
+) -> Optional[Dict[str, str]]:
+    """Search one query, fold its results into the identity index and return only new channels.
+
+    Returns None if the search failed; the query is then neither journaled as done nor
+    counted in its yield history, so a later run (or --resume) tries it again.
+    """
+    found = search_channels(query, seen=seen)
+    if found is None:
+        metrics().inc("search_queries_failed_total")
+        print(f"[WARN] Search for {query!r} failed; it will be retried on the next run")
+        return None
+    remember_channel_ids(found)
+    new = identity.add_many(found)
+    if journal is not None:
+        journal.record_query(query, new, len(found))
+    if stats is not None:
+        stats.record(query, len(found), len(new))
+    return new
+
+
+def plan_queries(queries: List[str], stats: Optional[QueryStats]) -> Tuple[List[str], Optional[YieldWindow]]:
+    """Order and prune queries by their past yield, with a stop window; unchanged without stats."""
+    if stats is None:
+        return queries, None
+    return stats.schedule(queries), YieldWindow(QUERY_STOP_WINDOW)
+
+
+def collect_all_channels(
+    journal: Optional[RunJournal] = None,
+    identity: Optional[ChannelIdentityIndex] = None,
+    stats: Optional[QueryStats] = None,
+) -> Set[str]:
+    """Run searches across all queries concurrently and return one canonical URL per channel.
+
+    With stats, queries run best-yield first, long-barren ones are skipped and discovery
+    stops after QUERY_STOP_WINDOW queries in a row find nothing new.
+    """
+    queries = list(SEARCH_QUERIES)
+    identity = identity if identity is not None else ChannelIdentityIndex()
+    seen = SharedSeen()
+    if journal is not None:
+        done = journal.done_queries()
+        known = journal.channels()
+        identity.add_many(known)
+        seen.add_new(_identity_keys(known))
+        if done:
+            print(f"[INFO] Resuming discovery: {len(done)} queries already done, {len(identity)} channels known")
+        queries = [q for q in queries if q not in done]
+    queries, window = plan_queries(queries, stats)
+
+    def run_query(query: str) -> Tuple[bool, Optional[Dict[str, str]]]:
+        """(whether it ran, its new channels or None if the search failed)."""
+        if window is not None and window.exhausted:
+            return False, None
+        new = discover_query(query, identity, seen, journal, stats)
+        if window is not None and new is not None:
+            window.add(len(new))
+        return True, new
+
+    results = run_concurrently(run_query, queries)
+    total = 0
+    not_run = 0
+    for query, (ran, new) in zip(queries, results):
+        if not ran:
+            not_run += 1
+            continue
+        if new is None:
+            continue
+        total += len(new)
+        print(f"[INFO] Query {query!r}: +{len(new)} new channels ({total} new this run)")
+    if not_run:
+        metrics().inc("search_queries_skipped_total", not_run, reason="window")
+        print(f"[INFO] {not_run} lower-yield queries not run")
+    print(f"[INFO] {len(identity)} unique channels; {identity.merged_aliases()} duplicate URLs merged by channelId")
+    return identity.urls()
+
+
+def process_channels(
+    channels: Set[str],
+    journal: Optional[RunJournal] = None,
+    sink: Optional[Callable[[Dict[str, str]], None]] = None,
+) -> List[Dict[str, str]]:
+    """Fetch metadata for each channel concurrently and prepare rows for export.
+
+    With a sink, each row is handed over as soon as it is finished and nothing is
+    accumulated (the returned list is empty).
+    """
+    ordered = sorted(channels)
+    if journal is not None:
+        done = journal.done_channels()
+        if done:
+            print(f"[INFO] Resuming enrichment: skipping {len(done & channels)} finished channels")
+        ordered = [url for url in ordered if url not in done]
+    total = len(ordered)
+
+    def process_one(item: Any) -> Optional[Dict[str, str]]:
+        idx, channel_url = item
         print(f"\n[{idx}/{total}] Processing channel: {channel_url}")
-        try:
-            about_info = parse_about_page(channel_url)
-            about_info["Views Last 30 Days"] = views_last_30_days(channel_url)
-            rows.append(about_info)
-        except Exception as exc:
-            print(f"[WARN] Skipping {channel_url} due to error: {exc}")
-    return rows
+        row = enrich_about(channel_url, journal)
+        if row is None or not enrich_views(channel_url, row, journal):
+            return None
+        finish_row(channel_url, row, journal)
+        if sink is not None:
+            sink(row)
+            return None
+        return row
+
+    results = run_concurrently(process_one, enumerate(ordered, start=1))
+    return [row for row in results if row is not None]
+
+
+def enrich_about(
+    channel_url: str,
+    journal: Optional[RunJournal] = None,
+    channel_id: str = "",
+) -> Optional[Dict[str, str]]:
+    """About-page stage: return the channel's row, or None (journaled as failed) on error.
+
+    channel_id, when discovery already knows it, fills 'Channel ID' if the page lacks one.
+    """
+    try:
+        return adopt_about_row(channel_url, parse_about_page(channel_url), channel_id)
+    except Exception as exc:
+        skip_channel(channel_url, exc, journal)
+        return None
+
+
+async def fetch_about_offloaded(
+    channel_url: str, threads: Executor
+) -> Tuple[Optional[PageDocument], Dict[str, str]]:
+    """Fetch a channel's About page on `threads` and parse it off the event loop; may raise."""
+    import asyncio
+
+    doc = await asyncio.get_running_loop().run_in_executor(threads, fetch_page, about_url(channel_url))
+    return doc, await parse_about_offloaded(channel_url, doc, threads)
 
 
-def export_results(rows: List[Dict[str, str]]) -> None:
+def enrich_about_many(channels: List[Dict[str, str]]) -> List[Optional[Dict[str, str]]]:
+    """enrich_about for many discovered channels, parsing in the process pool like the pipeline does."""
+    import asyncio
+
+    workers = max(1, MAX_WORKERS)
+
+    async def run_all() -> List[Optional[Dict[str, str]]]:
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(workers)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+
+            async def run(channel: Dict[str, str]) -> Optional[Dict[str, str]]:
+                channel_url = channel["url"]
+                async with semaphore:
+                    try:
+                        _, row = await fetch_about_offloaded(channel_url, pool)
+                    except Exception as exc:
+                        await loop.run_in_executor(pool, skip_channel, channel_url, exc)
+                        return None
+                    return await loop.run_in_executor(
+                        pool, adopt_about_row, channel_url, row, channel.get("channel_id", "")
+                    )
+
+            return await asyncio.gather(*(run(channel) for channel in channels))
+
+    if not channels:
+        return []
+    try:
+        return asyncio.run(run_all())
+    finally:
+        shutdown_parse_pool()
+
+
+def adopt_about_row(channel_url: str, row: Dict[str, str], channel_id: str = "") -> Dict[str, str]:
+    """Fill 'Channel ID' from discovery if the page lacked one and remember the resolution."""
+    row["Channel ID"] = row.get("Channel ID") or channel_id
+    if row["Channel ID"]:
+        remember_channel_ids({channel_url: row["Channel ID"]})
+    return row
+
+
+def skip_channel(channel_url: str, exc: Exception, journal: Optional[RunJournal] = None) -> None:
+    """Log a channel that failed a stage and journal it as failed."""
+    print(f"[WARN] Skipping {channel_url} due to error: {exc}")
+    metrics().inc("channels_failed_total")
+    if journal is not None:
+        journal.record_failure(channel_url, str(exc))
+
+
+def enrich_views(
+    channel_url: str,
+    row: Dict[str, str],
+    journal: Optional[RunJournal] = None,
+    views: bool = True,
+) -> bool:
+    """Views stage: fill 30-day views and exact API counts in place; False (journaled as failed) on error.
+
+    With views=False only the API counts are refreshed and the stored 30-day views are kept.
+    """
+    try:
+        channel_id = row.get("Channel ID") or None
+        if YT_API_ENABLED and not channel_id:
+            with quota_ledger().charge_to(channel_url):
+                channel_id = resolve_channel_id(channel_url)
+            row["Channel ID"] = channel_id or ""
+        if views:
+            row["Views Last 30 Days"] = views_last_30_days(channel_url, channel_id=channel_id)
+        row.update(api_channel_counts(channel_id))
+        return True
+    except Exception as exc:
+        skip_channel(channel_url, exc, journal)
+        return False
+
+
+def finish_row(channel_url: str, row: Dict[str, str], journal: Optional[RunJournal] = None) -> None:
+    """Count a finished row and commit it to the journal."""
+    metrics().inc("channels_finished_total")
+    if journal is not None:
+        # An empty name means the About page could not be fetched or parsed.
+        journal.record_row(channel_url, row, ok=bool(row.get("Name")))
+
+
+# about_q priorities: newly discovered channels overtake refreshes of known ones.
+_PRIORITY_NEW = 0
+_PRIORITY_KNOWN = 1
+_PRIORITY_STOP = 2
+
+
+async def _run_pipeline(
+    queries: List[str],
+    pending: List[str],
+    identity: ChannelIdentityIndex,
+    seen: SharedSeen,
+    journal: Optional[RunJournal],
+    sink: Optional[Callable[[Dict[str, str]], None]],
+    store: Optional[ChannelStore] = None,
+    plans: Optional[Dict[str, Set[str]]] = None,
+    stats: Optional[QueryStats] = None,
+) -> None:
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    query_q: "asyncio.Queue[str]" = asyncio.Queue()
+    queries, window = plan_queries(queries, stats)
+    for query in queries:
+        query_q.put_nowait(query)
+    about_q: "asyncio.PriorityQueue[Tuple[int, int, Optional[str]]]" = asyncio.PriorityQueue(
+        maxsize=PIPELINE_QUEUE_SIZE
+    )
+    views_q: "asyncio.Queue[Optional[Any]]" = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    plans = plans if plans is not None else {}
+    finished = 0
+    sequence = 0
+    workers = PIPELINE_SEARCH_WORKERS + PIPELINE_ABOUT_WORKERS + PIPELINE_VIEWS_WORKERS
+
+    async def enqueue(channel_url: Optional[str], priority: int) -> None:
+        nonlocal sequence
+        sequence += 1
+        await about_q.put((priority, sequence, channel_url))
+
+    async def feed_pending() -> None:
+        for channel_url in pending:
+            await enqueue(channel_url, _PRIORITY_KNOWN)
+
+    async def search_worker() -> None:
+        while True:
+            try:
+                query = query_q.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if window is not None and window.exhausted:
+                metrics().inc("search_queries_skipped_total", query_q.qsize() + 1, reason="window")
+                while not query_q.empty():
+                    query_q.get_nowait()
+                return
+            new = await loop.run_in_executor(pool, discover_query, query, identity, seen, journal, stats)
+            if new is None:
+                continue
+            if window is not None:
+                window.add(len(new))
+            print(f"[INFO] Query {query!r}: total unique channels so far: {len(identity)} (+{len(new)})")
+            for channel_url in sorted(new):
+                await enqueue(channel_url, _PRIORITY_NEW)
+
+    async def about_worker() -> None:
+        while True:
+            _, _, channel_url = await about_q.get()
+            if channel_url is None:
+                return
+            stale = plans.get(channel_url, set(FRESHNESS_POLICY))
+            refreshed: Set[str] = set()
+            stored = await loop.run_in_executor(pool, store.load, channel_url) if store is not None else None
+            if stored is None or needs_about_page(stale):
+                try:
+                    doc, row = await fetch_about_offloaded(channel_url, pool)
+                except Exception as exc:
+                    await loop.run_in_executor(pool, skip_channel, channel_url, exc, journal)
+                    continue
+                row = await loop.run_in_executor(
+                    pool, adopt_about_row, channel_url, row, identity.channel_id(channel_url)
+                )
+                if doc is not None and row.get("Name"):
+                    if stored is not None and "views" not in stale:
+                        row.update({k: v for k, v in stored[0].items() if k not in row})
+                    refreshed = {"about", "subscribers"}
+                elif stored is not None:
+                    # Keep the last good row; its About fields stay stale and are retried next run.
+                    print(f"[WARN] About page of {channel_url} unavailable; keeping the stored row")
+                    row = stored[0]
+            else:
+                row = stored[0]
+            await views_q.put((channel_url, row, stale, refreshed))
+
+    async def views_worker() -> None:
+        nonlocal finished
+        while True:
+            item = await views_q.get()
+            if item is None:
+                return
+            channel_url, row, stale, refreshed = item
+            refresh_views = "views" in stale or "Views Last 30 Days" not in row
+            if refresh_views or (YT_API_ENABLED and "subscribers" not in refreshed):
+                ok = await loop.run_in_executor(pool, enrich_views, channel_url, row, journal, refresh_views)
+                if not ok:
+                    continue
+                if refresh_views:
+                    refreshed.add("views")
+                if YT_API_ENABLED:
+                    refreshed.add("subscribers")
+            await loop.run_in_executor(pool, finish_row, channel_url, row, journal)
+            if store is not None:
+                await loop.run_in_executor(pool, store.save, channel_url, row, refreshed)
+            if sink is not None:
+                await loop.run_in_executor(pool, sink, row)
+            finished += 1
+            print(f"[INFO] Finished {finished} channel(s); queued: about={about_q.qsize()} views={views_q.qsize()}")
+
+    peaks = {"query": 0, "about": 0, "views": 0}
+
+    def sample_queues() -> None:
+        registry = metrics()
+        for name, queue in (("query", query_q), ("about", about_q), ("views", views_q)):
+            depth = queue.qsize()
+            peaks[name] = max(peaks[name], depth)
+            registry.set_gauge("queue_depth", depth, queue=name)
+            registry.set_gauge("queue_depth_max", peaks[name], queue=name)
+
+    async def queue_sampler() -> None:
+        while True:
+            sample_queues()
+            await asyncio.sleep(0.5)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        sampler = asyncio.create_task(queue_sampler())
+        about_tasks = [asyncio.create_task(about_worker()) for _ in range(max(1, PIPELINE_ABOUT_WORKERS))]
+        views_tasks = [asyncio.create_task(views_worker()) for _ in range(max(1, PIPELINE_VIEWS_WORKERS))]
+        await asyncio.gather(
+            feed_pending(),
+            *(search_worker() for _ in range(max(1, PIPELINE_SEARCH_WORKERS))),
+        )
+        for _ in about_tasks:
+            await enqueue(None, _PRIORITY_STOP)
+        await asyncio.gather(*about_tasks)
+        for _ in views_tasks:
+            await views_q.put(None)
+        await asyncio.gather(*views_tasks)
+        sampler.cancel()
+        sample_queues()
+
+
+def run_pipeline(
+    journal: Optional[RunJournal] = None,
+    sink: Optional[Callable[[Dict[str, str]], None]] = None,
+    store: Optional[ChannelStore] = None,
+    incremental: bool = False,
+    stats: Optional[QueryStats] = None,
+) -> Set[str]:
+    """Discover and enrich channels as one staged pipeline; return each discovered channel's canonical URL.
+
+    Search results stream into About-page parsing and then into the 30-day views stage
+    through bounded queues, so all stages run at the same time with their own worker counts.
+    Every finished row is saved to the store. With incremental=True, channels already in
+    the store are not rediscovered: fresh ones are exported from the store as they are and
+    only stale field groups are refreshed, after any newly discovered channels. With stats,
+    searches are scheduled by past yield as in collect_all_channels.
+    """
+    queries = list(SEARCH_QUERIES)
+    identity = ChannelIdentityIndex()
+    seen = SharedSeen()
+    pending: List[str] = []
+    plans: Dict[str, Set[str]] = {}
+    if journal is not None:
+        done_queries = journal.done_queries()
+        known = journal.channels()
+        identity.add_many(known)
+        seen.add_new(_identity_keys(known))
+        pending = sorted(set(known) - journal.done_channels())
+        queries = [q for q in queries if q not in done_queries]
+        if done_queries or known:
+            print(
+                f"[INFO] Resuming: {len(done_queries)} queries done, {len(known)} channels known, "
+                f"{len(pending)} still to enrich"
+            )
+    if incremental and store is not None:
+        stored = store.channels()
+        done = journal.done_channels() if journal is not None else set()
+        identity.add_many(stored)
+        seen.add_new(_identity_keys(stored))
+        up_to_date = 0
+        queued = set(pending)
+        for channel_url in sorted(set(stored) - done):
+            stale = store.stale_groups(channel_url)
+            if stale:
+                plans[channel_url] = stale
+                if channel_url not in queued:
+                    pending.append(channel_url)
+                    queued.add(channel_url)
+                continue
+            up_to_date += 1
+            row = store.load(channel_url)[0]
+            finish_row(channel_url, row, journal)
+            if sink is not None:
+                sink(row)
+        print(f"[INFO] Incremental: {up_to_date} stored channels up to date, {len(plans)} to refresh")
+    import asyncio
+
+    try:
+        asyncio.run(_run_pipeline(queries, pending, identity, seen, journal, sink, store, plans, stats))
+    finally:
+        shutdown_parse_pool()
+    print(f"[INFO] {identity.merged_aliases()} duplicate channel URLs merged by channelId before enrichment")
+    return identity.urls()
+
+
+# ------------------------------------------------------------
+# Export
+# ------------------------------------------------------------
+
+
+def _int_or_none(value: Any) -> Optional[int]:
+    text = str(value or "").strip()
+    return int(text) if text.isdigit() else None
+
+
+class ChannelRecord:
+    """Typed export row: the display text plus integer counts analytics can filter on directly."""
+
+    __slots__ = (
+        "channel_url",
+        "channel_id",
+        "name",
+        "subscribers_text",
+        "subscribers",
+        "views_last_30_days",
+        "total_views",
+        "description",
+        "email",
+        "telegram",
+        "website",
+        "instagram",
+        "vk",
+        "facebook",
+    )
+
+    def __init__(
+        self,
+        channel_url: str,
+        channel_id: str = "",
+        name: str = "",
+        subscribers_text: str = "",
+        subscribers: Optional[int] = None,
+        views_last_30_days: Optional[int] = None,
+        total_views: Optional[int] = None,
+        description: str = "",
+        email: str = "",
+        telegram: str = "",
+        website: str = "",
+        instagram: str = "",
+        vk: str = "",
+        facebook: str = "",
+    ) -> None:
+        self.channel_url = channel_url
+        self.channel_id = channel_id
+        self.name = name
+        self.subscribers_text = subscribers_text
+        self.subscribers = subscribers
+        self.views_last_30_days = views_last_30_days
+        self.total_views = total_views
+        self.description = description
+        self.email = email
+        self.telegram = telegram
+        self.website = website
+        self.instagram = instagram
+        self.vk = vk
+        self.facebook = facebook
+
+    @classmethod
+    def from_row(cls, row: Dict[str, str], parse_text: bool = True) -> "ChannelRecord":
+        """Build a record from a pipeline row; the exact API subscriber count wins over the page text.
+
+        With parse_text=False subscribers stays None without an API count, for callers that
+        normalize the text of a whole batch at once (see ParquetExporter).
+        """
+        subscribers_text = row.get("Subscribers", "") or ""
+        subscribers = _int_or_none(row.get("Subscriber Count"))
+        if subscribers is None and parse_text:
+            subscribers = count_from_text(subscribers_text)
+        return cls(
+            channel_url=row.get("Channel URL", "") or "",
+            channel_id=row.get("Channel ID", "") or "",
+            name=row.get("Name", "") or "",
+            subscribers_text=subscribers_text,
+            subscribers=subscribers,
+            views_last_30_days=_int_or_none(row.get("Views Last 30 Days")),
+            total_views=_int_or_none(row.get("Total Views")),
+            description=row.get("Description", "") or "",
+            email=row.get("Email", "") or "",
+            telegram=row.get("Telegram", "") or "",
+            website=row.get("Website", "") or "",
+            instagram=row.get("Instagram", "") or "",
+            vk=row.get("VK", "") or "",
+            facebook=row.get("Facebook", "") or "",
+        )
+
+
+# Integer columns of ChannelRecord; every other slot is a string.
+RECORD_INT_COLUMNS = {"subscribers", "views_last_30_days", "total_views"}
+
+
+def record_schema() -> "pa.Schema":
+    """Arrow schema for ChannelRecord columns (nullable int64 counts, string text)."""
+    import pyarrow as pa
+
+    return pa.schema(
+        [(name, pa.int64() if name in RECORD_INT_COLUMNS else pa.string()) for name in ChannelRecord.__slots__]
+    )
+
+
+class ParquetExporter:
+    """Buffers ChannelRecords column by column and writes them out as Parquet row groups.
+
+    Subscriber text without an API count is normalized per row group with normalize_counts.
+    """
+
+    def __init__(self, path: str = PARQUET_FILENAME, row_group: int = PARQUET_ROW_GROUP) -> None:
+        import pyarrow.parquet  # noqa: F401  (fail early, before any rows are buffered)
+
+        self.path = path
+        self.row_group = max(1, row_group)
+        self.count = 0
+        self._schema = record_schema()
+        self._columns: Dict[str, List[Any]] = {name: [] for name in ChannelRecord.__slots__}
+        self._writer: Optional["pq.ParquetWriter"] = None
+
+    def write(self, record: ChannelRecord) -> None:
+        for name, column in self._columns.items():
+            column.append(getattr(record, name))
+        self.count += 1
+        if len(self._columns["channel_url"]) >= self.row_group:
+            self._flush()
+
+    def _flush(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._columns["channel_url"]:
+            return
+        subscribers, texts = self._columns["subscribers"], self._columns["subscribers_text"]
+        missing = [i for i, count in enumerate(subscribers) if count is None and texts[i]]
+        if missing:
+            counts = normalize_counts(texts[i] for i in missing)
+            for i, count in zip(missing, counts.astype("object").where(counts.notna(), None)):
+                subscribers[i] = count
+        table = pa.Table.from_pydict(self._columns, schema=self._schema)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self._schema, compression="zstd")
+        self._writer.write_table(table)
+        for column in self._columns.values():
+            column.clear()
+
+    def close(self) -> None:
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class StreamingExporter:
+    """Append rows to the CSV as they arrive, to a write-only (constant-memory) XLSX sheet
+    and, when pyarrow is available, to a typed Parquet file in row groups."""
+
+    def __init__(
+        self,
+        csv_path: str = CSV_FILENAME,
+        xlsx_path: str = XLSX_FILENAME,
+        parquet_path: str = PARQUET_FILENAME,
+    ) -> None:
+        self.csv_path = csv_path
+        self.xlsx_path = xlsx_path
+        self._parquet: Optional[ParquetExporter] = None
+        if parquet_path:
+            try:
+                self._parquet = ParquetExporter(parquet_path)
+            except ImportError:
+                print("[WARN] pyarrow is not installed; skipping the Parquet export.")
+        self.count = 0
+        self._lock = threading.Lock()
+        self._csv_file = open(csv_path, "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._csv_file, delimiter=";", lineterminator=os.linesep)
+        self._csv.writerow(EXPORT_COLUMNS)
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+        self._illegal_chars = ILLEGAL_CHARACTERS_RE
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Sheet1")
+        self._sheet.append(EXPORT_COLUMNS)
+
+    def write(self, row: Dict[str, str]) -> None:
+        values = [row.get(col, "") or "" for col in EXPORT_COLUMNS]
+        with self._lock:
+            self._csv.writerow(values)
+            self._csv_file.flush()
+            self._sheet.append([self._illegal_chars.sub("", v) if isinstance(v, str) else v for v in values])
+            if self._parquet is not None:
+                self._parquet.write(ChannelRecord.from_row(row, parse_text=False))
+            self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._csv_file.close()
+            if not self.count:
+                os.remove(self.csv_path)
+                print("[WARN] No data collected; nothing to export.")
+                return
+            self._workbook.save(self.xlsx_path)
+            if self._parquet is not None:
+                self._parquet.close()
+        print(f"[INFO] CSV saved to {self.csv_path}")
+        print(f"[INFO] Excel saved to {self.xlsx_path}")
+        if self._parquet is not None:
+            print(f"[INFO] Parquet saved to {self._parquet.path}")
+
+    def __enter__(self) -> "StreamingExporter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def export_results(rows: Iterable[Dict[str, str]]) -> None:
     """Write collected data to CSV and Excel files."""
-    if not rows:
-        print("[WARN] No data collected; nothing to export.")
+    with StreamingExporter() as exporter:
+        for row in rows:
+            exporter.write(row)
+
+
+# ------------------------------------------------------------
+# Staged commands
+# ------------------------------------------------------------
+
+
+def warn_if_no_api_key() -> None:
+    if not YT_API_ENABLED:
+        print("[WARN] YOUTUBE_API_KEY is not set; 'Views Last 30 Days' will be empty for all channels.")
+
+
+def report_run() -> None:
+    """End-of-run report shared by the default run and the staged commands; writes the metrics dump."""
+    if _SESSION is not None or _CACHE is not None:
+        report_api_usage()
+        if _CACHE is not None:
+            print(
+                f"[INFO] HTTP cache hits: {_CACHE.hits}, revalidated: {_CACHE.revalidated}, "
+                f"misses: {_CACHE.misses}"
+            )
+        conn = connection_stats()
+        print(
+            f"[INFO] HTTP requests: {conn['requests']}, new connections: {conn['new_connections']}, "
+            f"reused: {conn['reused']}"
+        )
+    for line in metrics_summary_lines():
+        print(f"[METRICS] {line}")
+    if METRICS_PATH:
+        write_metrics(METRICS_PATH)
+        print(f"[INFO] Run metrics written to {METRICS_PATH}")
+
+
+@contextmanager
+def reported_run() -> Iterator[None]:
+    """Start fresh metrics, keep the dump current while the block runs, then report."""
+    metrics().reset()
+    with periodic_metrics_export(METRICS_PATH, METRICS_INTERVAL):
+        yield
+    report_run()
+
+
+def stage_path(stage_dir: str, stage: str, shard: Optional[Tuple[int, int]] = None) -> str:
+    name = STAGE_FILES[stage]
+    if shard is not None:
+        base, ext = os.path.splitext(name)
+        name = base + SHARD_SUFFIX.format(k=shard[0], n=shard[1]) + ext
+    return os.path.join(stage_dir, name)
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """argparse type for --shard: 'k/N' with 1 <= k <= N."""
+    try:
+        k, n = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected k/N, got {text!r}") from None
+    if not 1 <= k <= n:
+        raise argparse.ArgumentTypeError(f"shard {k} is not in 1..{n}")
+    return k, n
+
+
+def shard_of(channel_url: str, channel_id: str, shards: int) -> int:
+    """1-based shard of a channel: a stable hash of its identity key, the same on every machine."""
+    digest = hashlib.blake2b(identity_key(channel_url, channel_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards + 1
+
+
+def in_shard(channel_url: str, channel_id: str, shard: Optional[Tuple[int, int]]) -> bool:
+    return shard is None or shard_of(channel_url, channel_id, shard[1]) == shard[0]
+
+
+def write_jsonl(path: str, records: Iterable[Dict[str, str]]) -> int:
+    """Atomically replace path with one JSON object per line; return how many were written."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    count = 0
+    with open(tmp, "w", encoding="utf-8") as fh:
+        for record in records:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    os.replace(tmp, path)
+    return count
+
+
+def read_jsonl(path: str) -> Iterator[Dict[str, str]]:
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_stage(
+    stage_dir: str, stage: str, command: str, shard: Optional[Tuple[int, int]] = None
+) -> Optional[Iterator[Dict[str, str]]]:
+    """Stream the records written by an earlier stage, or None (with a hint) if that stage hasn't run."""
+    path = stage_path(stage_dir, stage, shard)
+    if not os.path.exists(path):
+        flag = f" --shard {shard[0]}/{shard[1]}" if shard is not None else ""
+        print(f"[WARN] {path} not found; run 'python main.py {stage}{flag}' before '{command}'.")
+        return None
+    return read_jsonl(path)
+
+
+def stage_discover(stage_dir: str) -> None:
+    """Search every query and save the discovered channels (URL + channelId)."""
+    identity = ChannelIdentityIndex()
+    stats = QueryStats(QUERY_STATS_PATH) if QUERY_STATS_PATH else None
+    urls = collect_all_channels(identity=identity, stats=stats)
+    path = stage_path(stage_dir, "discover")
+    count = write_jsonl(path, ({"url": url, "channel_id": identity.channel_id(url)} for url in sorted(urls)))
+    print(f"[INFO] {count} channels written to {path}")
+
+
+def stage_enrich(stage_dir: str, shard: Optional[Tuple[int, int]] = None) -> None:
+    """Parse the About page of every discovered channel and save the rows."""
+    records = read_stage(stage_dir, "discover", "enrich")
+    if records is None:
         return
+    channels = list(records)
+    if shard is not None:
+        total = len(channels)
+        channels = [ch for ch in channels if in_shard(ch["url"], ch.get("channel_id", ""), shard)]
+        print(f"[INFO] Shard {shard[0]}/{shard[1]}: {len(channels)} of {total} channels")
+    rows = enrich_about_many(channels)
+    path = stage_path(stage_dir, "enrich", shard)
+    count = write_jsonl(path, (row for row in rows if row is not None))
+    print(f"[INFO] {count} About rows written to {path}")
+
+
+def stage_views(stage_dir: str, shard: Optional[Tuple[int, int]] = None) -> None:
+    """Add 30-day views and exact API counts to the enriched rows (Data API only)."""
+    warn_if_no_api_key()
+    records = read_stage(stage_dir, "enrich", "views", shard)
+    if records is None:
+        return
+    # Kept as a list: the results below are zipped back against it.
+    rows = list(records)
+    ok = run_concurrently(lambda row: enrich_views(row["Channel URL"], row), rows)
+    path = stage_path(stage_dir, "views", shard)
+    count = write_jsonl(path, (row for row, done in zip(rows, ok) if done))
+    print(f"[INFO] {count} rows written to {path}")
+
+
+def stage_export(stage_dir: str) -> None:
+    """Write the final rows to CSV, XLSX and Parquet, streaming them from the stage file."""
+    rows = read_stage(stage_dir, "views", "export")
+    if rows is not None:
+        export_results(rows)
+
+
+def shard_partials(stage_dir: str, stage: str) -> Dict[int, Dict[int, str]]:
+    """Partial files of a stage found in stage_dir, as {N: {k: path}}."""
+    base, ext = os.path.splitext(STAGE_FILES[stage])
+    suffix = re.escape(SHARD_SUFFIX).replace(r"\{k\}", r"(\d+)").replace(r"\{n\}", r"(\d+)")
+    pattern = re.compile(re.escape(base) + suffix + re.escape(ext) + "$")
+    found: Dict[int, Dict[int, str]] = {}
+    for name in sorted(os.listdir(stage_dir)) if os.path.isdir(stage_dir) else []:
+        match = pattern.match(name)
+        if match:
+            k, n = int(match.group(1)), int(match.group(2))
+            found.setdefault(n, {})[k] = os.path.join(stage_dir, name)
+    return found
+
+
+def row_completeness(row: Dict[str, str]) -> int:
+    return sum(1 for value in row.values() if value not in ("", None))
+
+
+def merge_rows(paths: Iterable[str]) -> List[Dict[str, str]]:
+    """Rows from all partials, one per channel (the most complete copy wins), ordered by URL."""
+    merged: Dict[str, Dict[str, str]] = {}
+    for path in paths:
+        for row in read_jsonl(path):
+            key = identity_key(row.get("Channel URL", ""), row.get("Channel ID", ""))
+            kept = merged.get(key)
+            if kept is None or row_completeness(row) > row_completeness(kept):
+                merged[key] = row
+    return sorted(merged.values(), key=lambda row: row.get("Channel URL", ""))
+
+
+def stage_merge(stage_dir: str) -> None:
+    """Combine the per-shard rows of 'views --shard k/N' into rows.jsonl and export them."""
+    partials = shard_partials(stage_dir, "views")
+    if not partials:
+        print(f"[WARN] No shard partials in {stage_dir}; run 'python main.py views --shard k/N' first.")
+        return
+    paths: List[str] = []
+    for n, shards in sorted(partials.items()):
+        missing = sorted(set(range(1, n + 1)) - set(shards))
+        if missing:
+            print(f"[WARN] Sharding into {n}: no output yet for shard(s) {', '.join(map(str, missing))}.")
+        paths.extend(shards[k] for k in sorted(shards))
+    if len(partials) > 1:
+        counts = ", ".join(map(str, sorted(partials)))
+        print(f"[WARN] Partials from several shard counts ({counts}) are merged together.")
+    rows = merge_rows(paths)
+    path = stage_path(stage_dir, "views")
+    count = write_jsonl(path, rows)
+    print(f"[INFO] {count} unique rows from {len(paths)} partial(s) written to {path}")
+    export_results(rows)
 
-    csv_filename = "channels_auto_ru.csv"
-    xlsx_filename = "channels_auto_ru.xlsx"
 
-    df = pd.DataFrame(rows)[
-        [
-            "Channel URL",
-            "Name",
-            "Subscribers",
-            "Views Last 30 Days",
-            "Description",
-            "Email",
-            "Telegram",
-            "Website",
-            "Instagram",
-            "VK",
-            "Facebook",
-        ]
-    ]
+STAGE_COMMANDS: Dict[str, Callable[..., None]] = {
+    "discover": stage_discover,
+    "enrich": stage_enrich,
+    "views": stage_views,
+    "merge": stage_merge,
+    "export": stage_export,
+}
+# Stages that accept --shard k/N and then read/write only their shard's partial files.
+SHARDED_STAGES = ("enrich", "views")
 
-    df.to_csv(csv_filename, sep=";", index=False, encoding="utf-8")
-    print(f"[INFO] CSV saved to {csv_filename}")
 
-    df.to_excel(xlsx_filename, index=False)
-    print(f"[INFO] Excel saved to {xlsx_filename}")
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Collect YouTube channels for SEARCH_QUERIES and export them. Without a command, "
+            "runs every stage as one streaming pipeline."
+        )
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue the previous run from its journal instead of starting over",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="refresh only stale fields of channels seen by earlier runs (see FRESHNESS_POLICY)",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    for name, func in STAGE_COMMANDS.items():
+        stage = commands.add_parser(name, help=func.__doc__)
+        stage.add_argument("--dir", default=STAGE_DIR, help=f"directory for intermediate files (default: {STAGE_DIR})")
+        if name in SHARDED_STAGES:
+            stage.add_argument(
+                "--shard",
+                type=parse_shard,
+                metavar="K/N",
+                help="process only the channels whose id hashes to shard K of N (combine with 'merge')",
+            )
+    return parser.parse_args(argv)
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.command:
+        kwargs = {"shard": args.shard} if args.command in SHARDED_STAGES else {}
+        with reported_run():
+            STAGE_COMMANDS[args.command](args.dir, **kwargs)
+        return
+    warn_if_no_api_key()
+    journal = RunJournal(JOURNAL_PATH) if JOURNAL_PATH else None
+    if journal is not None and not args.resume:
+        journal.reset()
+    elif journal is None and args.resume:
+        print("[WARN] SCRAPER_JOURNAL is empty; --resume has nothing to resume from.")
+    store = ChannelStore(CHANNEL_STORE_PATH) if CHANNEL_STORE_PATH else None
+    if store is None and args.incremental:
+        print("[WARN] SCRAPER_STORE is empty; --incremental falls back to a full run.")
+
+    stats = QueryStats(QUERY_STATS_PATH) if QUERY_STATS_PATH else None
+
     print("[START] Collecting Russian auto-related YouTube channels...")
-    channels = collect_all_channels()
-    print(f"\n[SUMMARY] Total unique channels discovered: {len(channels)}\n")
-    rows = process_channels(channels)
-    export_results(rows)
+    with reported_run():
+        with StreamingExporter() as exporter:
+            if journal is not None and args.resume:
+                for row in journal.iter_rows(done_only=True):
+                    exporter.write(row)
+            channels = run_pipeline(
+                journal, sink=exporter.write, store=store, incremental=args.incremental, stats=stats
+            )
+        print(f"\n[SUMMARY] Total unique channels discovered: {len(channels)}\n")
     print("[DONE] Completed scraping.")
 
 